@@ -0,0 +1,78 @@
+"""Mede o tempo de inicialização a frio dos módulos e compara com o orçamento
+
+Uso: python benchmarks/bench_inicializacao.py [--repeticoes N] [--saida arquivo.json]
+Sai com código 1 se algum módulo estourar o orçamento.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from comum import escrever_resultado
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento (ms) do custo de importação, já descontado o início do interpretador.
+# O núcleo só pode depender da biblioteca padrão e do NumPy.
+ORCAMENTO_MS = {
+    "regras": 250,
+    "simulacao": 250,
+    "servidor": 250,
+    "jogo": 600,
+}
+
+# Módulos que não podem ser carregados ao importar cada alvo
+PROIBIDOS = {
+    "regras": ["pygame", "matplotlib"],
+    "simulacao": ["pygame", "matplotlib"],
+    "servidor": ["pygame", "matplotlib"],
+    "jogo": ["matplotlib"],
+}
+
+
+def _cronometrar(codigo):
+    """Tempo de parede (ms) de um interpretador novo executando `codigo`"""
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def _modulos_carregados(modulo):
+    codigo = f"import sys, {modulo}; print(' '.join(sys.modules))"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                           capture_output=True, text=True, env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"))
+    return set(saida.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=7)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    base = statistics.median(_cronometrar("pass") for _ in range(args.repeticoes))
+    resultado = {"interpretador_ms": round(base, 1), "modulos": {}, "ok": True}
+    for modulo, orcamento in ORCAMENTO_MS.items():
+        tempos = [_cronometrar(f"import {modulo}") - base for _ in range(args.repeticoes)]
+        mediana = statistics.median(tempos)
+        carregados = _modulos_carregados(modulo)
+        indevidos = [m for m in PROIBIDOS[modulo] if m in carregados]
+        ok = mediana <= orcamento and not indevidos
+        resultado["modulos"][modulo] = {
+            "mediana_ms": round(mediana, 1),
+            "minimo_ms": round(min(tempos), 1),
+            "orcamento_ms": orcamento,
+            "importados_indevidamente": indevidos,
+            "ok": ok,
+        }
+        resultado["ok"] = resultado["ok"] and ok
+
+    escrever_resultado(resultado, args.saida)
+    sys.exit(0 if resultado["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Tempo por etapa de desenho com históricos de tamanhos diferentes (sem janela, SDL dummy)
+
+Uso: python benchmarks/bench_quadros.py [--tamanhos 10 1000 100000 1000000] [--quadros 120]
+                                        [--grafico matplotlib|pygame] [--assincrono] [--saida resultado.json]
+                                        [--jogadores 8] [--casas 300]
+Gera JSON com p50/p95/p99 (ms) de cada etapa para cada tamanho de histórico.
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pygame
+
+from comum import percentis, escrever_resultado
+from jogo import CorridaEstatistica
+
+ETAPAS = ["_desenhar_painel_esquerdo", "_desenhar_tabuleiro", "_desenhar_peoes",
+          "_gerar_grafico_matplotlib", "_gerar_grafico_pygame", "_calcular_stats_texto"]
+
+# A cada tantos quadros o roteiro aperta Espaço (novo lançamento e gráfico regenerado)
+INTERVALO_LANCAMENTOS = 10
+
+
+def preencher_historico(jogo, n, rng):
+    """Coloca n lançamentos no histórico, alternando jogadores, como se tivessem sido jogados"""
+    dados = rng.integers(1, 7, size=(n, 2))
+    for i, (d1, d2) in enumerate(dados.tolist()):
+        pid = 1 + i % jogo.n_jogadores
+        soma = d1 + d2
+        estat = jogo.estatisticas[pid]
+        estat.adicionar(soma)
+        jogo.jogadores[pid]['dados'].adicionar(soma)
+        jogo.historico_lancamentos[pid].adicionar((d1, d2))
+        jogo.historico_medias[pid].adicionar(estat.media)
+    jogo.dados_para_grafico_atualizados = True
+
+
+def instrumentar(jogo, tempos):
+    """Troca as etapas do objeto por versões cronometradas (tempos inclusivos, em ms)"""
+    for nome in ETAPAS:
+        original = getattr(jogo, nome)
+        tempos[nome] = []
+
+        def cronometrado(*args, _original=original, _destino=tempos[nome], **kwargs):
+            inicio = time.perf_counter()
+            resultado = _original(*args, **kwargs)
+            _destino.append((time.perf_counter() - inicio) * 1000)
+            return resultado
+
+        setattr(jogo, nome, cronometrado)
+
+
+def roteiro(quadro):
+    """Entrada simulada: lança os dados periodicamente e mexe o mouse no painel"""
+    eventos = [pygame.event.Event(pygame.MOUSEMOTION, pos=(100 + quadro % 200, 300), rel=(1, 0), buttons=(0, 0, 0))]
+    if quadro % INTERVALO_LANCAMENTOS == 0:
+        eventos.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" ", scancode=0))
+    return eventos
+
+
+def medir(tamanho, quadros, modo_grafico, semente, assincrono=False, n_jogadores=2, casas=30):
+    # Síncrono por padrão para medir o custo do gráfico; --assincrono mede o que o laço principal sente
+    jogo = CorridaEstatistica(modo_grafico=modo_grafico, modo_redesenho="completo", semente=semente,
+                              grafico_assincrono=assincrono, n_jogadores=n_jogadores, casas=casas)
+    for pid in jogo.ids_jogadores:
+        jogo.selecionar_poder(pid, (pid - 1) % len(jogo.poderes_disponiveis))
+    preencher_historico(jogo, tamanho, np.random.default_rng(semente))
+
+    tempos = {}
+    instrumentar(jogo, tempos)
+    tempos["quadro"] = []
+    for quadro in range(quadros):
+        for evento in roteiro(quadro):
+            pygame.event.post(evento)
+        inicio = time.perf_counter()
+        for evento in pygame.event.get():
+            jogo._tratar_evento(evento)
+        if jogo.vencedor:
+            # Recomeça a corrida sem apagar o histórico
+            jogo.posicoes[:] = 0
+            jogo.vencedor = None
+            jogo.estado = "jogando"
+        jogo._avancar_timers()
+        jogo._desenhar_quadro()
+        tempos["quadro"].append((time.perf_counter() - inicio) * 1000)
+
+    return {nome: percentis(valores) for nome, valores in tempos.items() if valores}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000])
+    parser.add_argument("--quadros", type=int, default=120)
+    parser.add_argument("--grafico", choices=["matplotlib", "pygame"], default="matplotlib")
+    parser.add_argument("--assincrono", action="store_true", help="Gráficos do matplotlib em segundo plano")
+    parser.add_argument("--semente", type=int, default=1234)
+    parser.add_argument("--jogadores", type=int, default=2)
+    parser.add_argument("--casas", type=int, default=30)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    resultado = {
+        "config": {"quadros": args.quadros, "grafico": args.grafico, "assincrono": args.assincrono,
+                   "jogadores": args.jogadores, "casas": args.casas,
+                   "semente": args.semente,
+                   "intervalo_lancamentos": INTERVALO_LANCAMENTOS, "unidade": "ms",
+                   "python": sys.version.split()[0], "pygame": pygame.version.ver, "numpy": np.__version__},
+        "resultados": {},
+    }
+    for tamanho in args.tamanhos:
+        resultado["resultados"][str(tamanho)] = medir(tamanho, args.quadros, args.grafico, args.semente,
+                                                      args.assincrono, args.jogadores, args.casas)
+        print(f"histórico {tamanho}: ok", file=sys.stderr)
+
+    escrever_resultado(resultado, args.saida)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
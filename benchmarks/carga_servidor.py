@@ -0,0 +1,164 @@
+"""Gerador de carga local para servidor.py: muitas partidas simultâneas, vazão e latência por comando
+
+Uso: python benchmarks/carga_servidor.py [--partidas 2000] [--rodadas 1] [--jogadores 2] [--casas 30]
+                                         [--porta 5050] [--iniciar-servidor] [--saida resultado.json]
+Cada partida abre uma conexão por jogador e joga até o fim (PODER, USAR na primeira vez, JOGAR),
+esperando a vez com ESPERAR. Gera JSON com p50/p95/p99 (ms) de cada comando e a vazão total.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from comum import percentis, escrever_resultado
+from regras import PODERES
+from servidor import ClienteCorrida, PORTA_PADRAO, aumentar_limite_arquivos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Carga:
+    """Joga as partidas e anota a latência (ms) de cada comando, exceto ESPERAR (que espera o oponente)"""
+
+    def __init__(self, host, porta, n_jogadores, casas, semente):
+        self.host = host
+        self.porta = porta
+        self.n_jogadores = n_jogadores
+        self.casas = casas
+        self.rng = random.Random(semente)
+        self.latencias = {}
+        self.comandos = 0
+        self.concluidas = 0
+        self.abandonadas = 0
+
+    async def _pedir(self, cliente, *comando):
+        inicio = time.perf_counter()
+        resposta = await cliente.pedir(*comando)
+        if comando[0] != "ESPERAR":
+            self.latencias.setdefault(comando[0], []).append((time.perf_counter() - inicio) * 1000)
+        self.comandos += 1
+        return resposta
+
+    async def _jogar_assento(self, cliente, poder):
+        usou = False
+        while True:
+            estado = (await self._pedir(cliente, "ESPERAR"))[0]
+            if estado == "selecao_poder":
+                await self._pedir(cliente, "PODER", poder)
+            elif estado == "jogando":
+                if not usou:
+                    await self._pedir(cliente, "USAR")
+                    usou = True
+                await self._pedir(cliente, "JOGAR")
+            else:
+                return estado
+
+    async def partida(self):
+        clientes = [await ClienteCorrida.conectar(self.host, self.porta) for _ in range(self.n_jogadores)]
+        try:
+            id_partida, _ = await self._pedir(clientes[0], "NOVA", self.n_jogadores, self.casas,
+                                              self.rng.randrange(2 ** 32))
+            for cliente in clientes[1:]:
+                await self._pedir(cliente, "ENTRAR", id_partida)
+            finais = await asyncio.gather(*(self._jogar_assento(c, self.rng.randrange(len(PODERES)))
+                                            for c in clientes))
+            if "fim" in finais:
+                self.concluidas += 1
+            else:
+                self.abandonadas += 1
+        finally:
+            for cliente in clientes:
+                await cliente.fechar()
+
+    async def sequencia(self, rodadas):
+        for _ in range(rodadas):
+            await self.partida()
+
+
+async def info_servidor(host, porta):
+    cliente = await ClienteCorrida.conectar(host, porta)
+    info = {chave: int(valor) for chave, valor in (item.split("=") for item in await cliente.pedir("INFO"))}
+    await cliente.fechar()
+    return info
+
+
+async def medir(host, porta, partidas, rodadas, n_jogadores, casas, semente):
+    antes = await info_servidor(host, porta)
+    carga = Carga(host, porta, n_jogadores, casas, semente)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(carga.sequencia(rodadas) for _ in range(partidas)))
+    duracao = time.perf_counter() - inicio
+    # O pico de RSS inclui todas as partidas simultâneas; a memória atual mostra o que foi liberado depois
+    depois = await info_servidor(host, porta)
+    memoria_kb = depois["pico_memoria_kb"] - antes["pico_memoria_kb"]
+
+    return {
+        "duracao_s": round(duracao, 3),
+        "partidas_concluidas": carga.concluidas,
+        "partidas_abandonadas": carga.abandonadas,
+        "partidas_por_s": round(carga.concluidas / duracao, 1),
+        "comandos": carga.comandos,
+        "comandos_por_s": round(carga.comandos / duracao, 1),
+        "latencia_ms": {comando: percentis(valores) for comando, valores in sorted(carga.latencias.items())},
+        "servidor": depois,
+        "memoria_kb_por_partida": round(memoria_kb / partidas, 1) if depois["pico_memoria_kb"] else None,
+        "memoria_liberada_kb": max(0, depois["pico_memoria_kb"] - depois["memoria_kb"]) if depois["memoria_kb"] else None,
+    }
+
+
+def iniciar_servidor(porta, max_partidas):
+    """Sobe servidor.py em outro processo e espera ele anunciar que está escutando"""
+    processo = subprocess.Popen([sys.executable, os.path.join(RAIZ, "servidor.py"), "--porta", str(porta),
+                                 "--max-partidas", str(max_partidas)],
+                                stdout=subprocess.PIPE, text=True)
+    linha = processo.stdout.readline()
+    if not linha.startswith("Servindo"):
+        processo.kill()
+        raise RuntimeError("o servidor não iniciou")
+    return processo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, default=2000, help="Partidas simultâneas")
+    parser.add_argument("--rodadas", type=int, default=1, help="Partidas seguidas em cada vaga")
+    parser.add_argument("--jogadores", type=int, default=2)
+    parser.add_argument("--casas", type=int, default=30)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--iniciar-servidor", action="store_true", help="Sobe servidor.py só para a medição")
+    parser.add_argument("--semente", type=int, default=1234)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    limite = aumentar_limite_arquivos()
+    if limite and limite < args.partidas * args.jogadores + 16:
+        parser.error(f"{args.partidas * args.jogadores} conexões não cabem no limite de {limite} descritores")
+
+    processo = iniciar_servidor(args.porta, args.partidas) if args.iniciar_servidor else None
+    try:
+        resultados = asyncio.run(medir(args.host, args.porta, args.partidas, args.rodadas, args.jogadores,
+                                       args.casas, args.semente))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    resultado = {
+        "config": {"partidas": args.partidas, "rodadas": args.rodadas, "jogadores": args.jogadores,
+                   "casas": args.casas, "semente": args.semente, "unidade": "ms",
+                   "python": sys.version.split()[0], "numpy": np.__version__},
+        "resultados": resultados,
+    }
+    escrever_resultado(resultado, args.saida)
+
+
+if __name__ == "__main__":
+    main()
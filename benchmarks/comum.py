@@ -0,0 +1,23 @@
+"""Funções compartilhadas pelos scripts de benchmarks/"""
+import json
+
+import numpy as np
+
+
+def percentis(valores):
+    """n, p50, p95 e p99 de uma lista de tempos (None se vazia)"""
+    if not valores:
+        return None
+    arr = np.asarray(valores)
+    return {"n": len(valores), "p50": round(float(np.percentile(arr, 50)), 4),
+            "p95": round(float(np.percentile(arr, 95)), 4), "p99": round(float(np.percentile(arr, 99)), 4)}
+
+
+def escrever_resultado(resultado, caminho=None):
+    """Grava o resultado em JSON no arquivo ou, sem caminho, na saída padrão"""
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if caminho:
+        with open(caminho, "w", encoding="utf-8") as arq:
+            arq.write(texto + "\n")
+    else:
+        print(texto)
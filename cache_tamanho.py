@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+
+class CachePorTamanho:
+    """Cache LRU pequeno de recursos que dependem do tamanho da janela (layouts, figuras, superfícies)
+
+    Voltar a um tamanho já usado reaproveita o que foi gerado para ele em vez de refazer.
+    """
+
+    def __init__(self, capacidade=4):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, tamanho):
+        """Recurso guardado para `tamanho`, ou None"""
+        item = self._itens.get(tamanho)
+        if item is None:
+            self.falhas += 1
+            return None
+        self._itens.move_to_end(tamanho)
+        self.acertos += 1
+        return item
+
+    def guardar(self, tamanho, item):
+        self._itens[tamanho] = item
+        self._itens.move_to_end(tamanho)
+        if len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def valores(self):
+        return list(self._itens.values())
+
+    def limpar(self):
+        self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+
+class CacheTexto:
+    """Cache LRU de superfícies de texto, chaveado por (fonte, texto, cor, antialias)"""
+
+    def __init__(self, capacidade=512):
+        self.capacidade = capacidade
+        self._superficies = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def render(self, fonte, texto, cor, antialias=True):
+        """Mesmo que fonte.render, mas reaproveita a superfície se já foi rasterizada.
+
+        A superfície devolvida é compartilhada: só deve ser desenhada, nunca alterada.
+        """
+        chave = (fonte, texto, tuple(cor), antialias)
+        surf = self._superficies.get(chave)
+        if surf is not None:
+            self._superficies.move_to_end(chave)
+            self.acertos += 1
+            return surf
+
+        self.falhas += 1
+        surf = fonte.render(texto, antialias, cor)
+        self._superficies[chave] = surf
+        if len(self._superficies) > self.capacidade:
+            self._superficies.popitem(last=False)
+        return surf
+
+    def limpar(self):
+        self._superficies.clear()
+
+    def zerar_contadores(self):
+        self.acertos = 0
+        self.falhas = 0
+
+    @property
+    def taxa_acertos(self):
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def __len__(self):
+        return len(self._superficies)
+
+
+# Cache compartilhado por toda a interface (painel, tabuleiro, menus e gráficos pygame)
+CACHE_TEXTO = CacheTexto()
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Maior soma possível: dois dados de 6 faces com "Dobrar Dados"
+SOMA_MAXIMA = 24
+
+# z da normal para o intervalo de confiança de 95%
+Z_95 = 1.959964
+
+
+class EstatisticasIncrementais:
+    """Acumulador por histograma: cada lançamento custa O(1) e as estatísticas são lidas em tempo constante"""
+
+    def __init__(self, valor_maximo=SOMA_MAXIMA):
+        self.contagens = np.zeros(valor_maximo + 1, dtype=np.int64)
+        self.n = 0
+        self.soma = 0
+        self.soma_quadrados = 0
+        self.versao = 0
+        self._texto_cache = None
+        self._versao_texto = -1
+
+    def reiniciar(self):
+        self.contagens[:] = 0
+        self.n = 0
+        self.soma = 0
+        self.soma_quadrados = 0
+        self.versao += 1
+
+    def adicionar(self, valor):
+        self.contagens[valor] += 1
+        self.n += 1
+        self.soma += valor
+        self.soma_quadrados += valor * valor
+        self.versao += 1
+
+    def adicionar_lote(self, valores):
+        """Acrescenta vários lançamentos de uma vez (histograma por bincount)"""
+        valores = np.asarray(valores, dtype=np.int64)
+        if valores.size == 0:
+            return
+        self.contagens += np.bincount(valores, minlength=len(self.contagens))
+        self.n += int(valores.size)
+        self.soma += int(valores.sum())
+        self.soma_quadrados += int((valores * valores).sum())
+        self.versao += 1
+
+    @property
+    def media(self):
+        return self.soma / self.n if self.n else None
+
+    @property
+    def variancia(self):
+        """Variância populacional (mesma convenção de np.var)"""
+        if not self.n:
+            return None
+        media = self.soma / self.n
+        return max(0.0, self.soma_quadrados / self.n - media * media)
+
+    def _valor_na_posicao(self, k, acumulado):
+        """k-ésimo menor valor (base 0) a partir das contagens acumuladas"""
+        return int(np.searchsorted(acumulado, k, side='right'))
+
+    @property
+    def mediana(self):
+        if not self.n:
+            return None
+        acumulado = np.cumsum(self.contagens)
+        meio = self.n // 2
+        if self.n % 2:
+            return float(self._valor_na_posicao(meio, acumulado))
+        return (self._valor_na_posicao(meio - 1, acumulado) + self._valor_na_posicao(meio, acumulado)) / 2
+
+    @property
+    def moda(self):
+        """Menor valor entre os mais frequentes (mesmo desempate de np.unique + np.argmax)"""
+        if not self.n:
+            return None
+        return int(np.argmax(self.contagens))
+
+    def texto(self):
+        """Média, mediana e moda formatadas; recalculadas só quando há lançamento novo"""
+        if self._versao_texto != self.versao:
+            if not self.n:
+                self._texto_cache = ("-", "-", "-")
+            else:
+                self._texto_cache = (f"{self.media:.2f}", f"{self.mediana:.1f}", f"{self.moda}")
+            self._versao_texto = self.versao
+        return self._texto_cache
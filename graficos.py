@@ -0,0 +1,484 @@
+import threading
+import traceback
+
+import numpy as np
+import pygame
+
+from estatisticas import SOMA_MAXIMA
+from cache_texto import CACHE_TEXTO
+from cache_tamanho import CachePorTamanho
+from probabilidades import pmf_lancamento, media_lancamento
+
+COR_FUNDO_FIGURA = '#141923'
+COR_FUNDO_EIXOS = '#232337'
+MEDIA_TEORICA = media_lancamento()
+
+# Atributos de uma figura montada por _criar_figura; guardados por tamanho para voltar a ele sem remontar
+ESTADO_FIGURA = ('fig', 'canvas', 'ax1', 'ax2', 'barras', 'linha_teorica', 'area_teorica', 'linhas_media',
+                 'bandas_media', '_media_teorica', 'linha_media_teorica', '_max_x')
+
+
+def intervalo_eixo_x(series):
+    """Valores exibidos no eixo X: de 2 até o maior valor observado (no mínimo 12)"""
+    maior = 12
+    for serie in series:
+        observados = np.flatnonzero(serie['contagens'])
+        if observados.size:
+            maior = max(maior, int(observados[-1]))
+    return np.arange(2, maior + 1)
+
+
+def fracao_dobrada(series):
+    """Fração dos lançamentos exibidos que foram feitos com Dobrar Dados"""
+    n = sum(s['n'] for s in series)
+    return sum(s.get('dobrados', 0) for s in series) / n if n else 0.0
+
+
+def probabilidade_teorica(valores, fracao=0.0):
+    """Distribuição teórica das somas registradas (2d6 misturado com 2d6 dobrado), zero fora do suporte"""
+    pmf = pmf_lancamento(fracao, SOMA_MAXIMA + 1)
+    valores = np.asarray(valores)
+    return np.where(valores <= SOMA_MAXIMA, pmf[np.minimum(valores, SOMA_MAXIMA)], 0.0)
+
+
+def posicao_barras(indice, n_series):
+    """Deslocamento e largura da barra da série `indice` no grupo de cada valor do histograma"""
+    return (indice - (n_series - 1) / 2) * 0.8 / n_series, 0.7 / n_series
+
+
+class GraficoMatplotlib:
+    """Figura persistente: os artistas são atualizados no lugar e o buffer Agg vira Surface sem PNG"""
+
+    def __init__(self):
+        self.tamanho = None
+        self.fig = None
+        self.canvas = None
+        self._buffer = None
+        self._max_x = None
+        self.figuras = CachePorTamanho()
+
+    def _criar_figura(self, w_inch, h_inch, series):
+        """Monta figura, eixos e artistas; só é chamada para um tamanho de painel que não está em cache"""
+        # Importado só aqui: o modo pygame nunca carrega o matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.fig = Figure(figsize=(w_inch + 1, h_inch), dpi=100)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.fig.patch.set_facecolor(COR_FUNDO_FIGURA)
+        self.ax1, self.ax2 = self.fig.subplots(1, 2)
+        self._max_x = None
+
+        # Gráfico 1: barras fixas para todas as somas possíveis, só a altura muda
+        todos_valores = np.arange(1, SOMA_MAXIMA + 1)
+        self.barras = {}
+        for indice, serie in enumerate(series):
+            pid = serie['pid']
+            offset, largura = posicao_barras(indice, len(series))
+            self.barras[pid] = self.ax1.bar(todos_valores + offset, np.zeros(len(todos_valores)),
+                                            width=largura, color=np.array(serie['cor']) / 255,
+                                            alpha=0.7, label=f"J{pid}")
+        self.linha_teorica, = self.ax1.plot([], [], 'w-', linewidth=2, alpha=0.8, label="Teórico")
+        self.area_teorica = None
+
+        self.ax1.set_title("Distribuição de Probabilidade", color='white', fontsize=10, pad=10)
+        self.ax1.set_xlabel('Soma dos Dados', color='white', fontsize=9)
+        self.ax1.set_ylabel('Frequência Relativa', color='white', fontsize=9)
+        self.ax1.legend(fontsize=7, facecolor=COR_FUNDO_EIXOS, loc='upper right', ncol=2 if len(series) > 4 else 1)
+
+        # Gráfico 2: convergência da média
+        self.linhas_media = {}
+        self.bandas_media = {}
+        for serie in series:
+            pid = serie['pid']
+            self.linhas_media[pid], = self.ax2.plot([], [], color=np.array(serie['cor']) / 255,
+                                                    linewidth=2, label=f"J{pid}")
+        self._media_teorica = MEDIA_TEORICA
+        self.linha_media_teorica = self.ax2.axhline(MEDIA_TEORICA, color='white', linestyle='--', linewidth=2,
+                                                    alpha=0.7, label=f"Média Teórica = {MEDIA_TEORICA:.1f}")
+        self.ax2.set_title("Lei dos Grandes Números", color='white', fontsize=10, pad=10)
+        self.ax2.set_xlabel('Número de Lançamentos', color='white', fontsize=9)
+        self.ax2.set_ylabel('Média Acumulada', color='white', fontsize=9)
+        self._legenda_convergencia(len(series))
+
+        # Estilização consistente
+        for ax in [self.ax1, self.ax2]:
+            ax.grid(True, alpha=0.3, color='gray')
+            ax.tick_params(colors='white', labelsize=8)
+            ax.set_facecolor(COR_FUNDO_EIXOS)
+            for spine in ax.spines.values():
+                spine.set_color('white')
+
+        self._ajustar_eixo_x(np.arange(2, 13))
+        self.fig.tight_layout(pad=2.0)
+
+    def _legenda_convergencia(self, n_series):
+        self.ax2.legend(fontsize=7, facecolor=COR_FUNDO_EIXOS, ncol=2 if n_series > 4 else 1)
+
+    def _ajustar_media_teorica(self, media):
+        """Move a média de referência quando há lançamentos dobrados (a legenda só é refeita se o texto mudar)"""
+        if media == self._media_teorica:
+            return
+        texto_antigo = f"{self._media_teorica:.1f}"
+        self._media_teorica = media
+        self.linha_media_teorica.set_ydata([media, media])
+        if f"{media:.1f}" != texto_antigo:
+            self.linha_media_teorica.set_label(f"Média Teórica = {media:.1f}")
+            self._legenda_convergencia(len(self.linhas_media))
+
+    def _atualizar_banda(self, serie):
+        """Refaz a faixa de confiança do jogador (fora do autoscale: o eixo Y segue só as médias)"""
+        banda = self.bandas_media.pop(serie['pid'], None)
+        if banda is not None:
+            banda.remove()
+        if len(serie.get('banda_x', ())) < 2:
+            return
+        self.bandas_media[serie['pid']] = self.ax2.fill_between(
+            serie['banda_x'], serie['banda_inferior'], serie['banda_superior'],
+            color=np.array(serie['cor']) / 255, alpha=0.2, linewidth=0)
+
+    def _ajustar_eixo_x(self, valores_possiveis):
+        """Atualiza limites e ticks do histograma quando o maior valor observado muda"""
+        max_x = int(valores_possiveis[-1])
+        if max_x == self._max_x:
+            return
+        self._max_x = max_x
+        self.ax1.set_xlim(valores_possiveis[0] - 0.7, max_x + 0.7)
+        if len(valores_possiveis) <= 20:  # Mostrar todos os valores se não for muito grande
+            self.ax1.set_xticks(valores_possiveis)
+        else:  # Caso contrário, mostrar a cada 2 valores
+            self.ax1.set_xticks(valores_possiveis[valores_possiveis % 2 == 0])
+
+    def _atualizar(self, series, w_inch, h_inch):
+        """Passa os dados atuais para os artistas da figura"""
+        tamanho = (int((w_inch + 1) * 100), int(h_inch * 100), len(series))
+        if tamanho != self.tamanho:
+            if self.tamanho is not None:
+                self.figuras.guardar(self.tamanho, {nome: getattr(self, nome) for nome in ESTADO_FIGURA})
+            guardada = self.figuras.obter(tamanho)
+            if guardada is None:
+                self._criar_figura(w_inch, h_inch, series)
+            else:
+                self.__dict__.update(guardada)
+            self.tamanho = tamanho
+
+        valores_possiveis = intervalo_eixo_x(series)
+        self._ajustar_eixo_x(valores_possiveis)
+
+        maior_freq = 0.0
+        for serie in series:
+            n = serie['n']
+            freq = serie['contagens'][1:SOMA_MAXIMA + 1] / n if n else np.zeros(SOMA_MAXIMA)
+            maior_freq = max(maior_freq, float(freq.max()))
+            for barra, altura in zip(self.barras[serie['pid']], freq):
+                barra.set_height(altura)
+
+            # Série já decimada: no máximo alguns milhares de pontos, qualquer que seja a sessão
+            self.linhas_media[serie['pid']].set_data(serie['medias_x'], serie['medias_y'])
+            self._atualizar_banda(serie)
+
+        fracao = fracao_dobrada(series)
+        prob_teo = probabilidade_teorica(valores_possiveis, fracao)
+        self.linha_teorica.set_data(valores_possiveis, prob_teo)
+        self._ajustar_media_teorica(media_lancamento(fracao))
+        if self.area_teorica is not None:
+            self.area_teorica.remove()
+        self.area_teorica = self.ax1.fill_between(valores_possiveis, prob_teo, alpha=0.2, color='white')
+        self.ax1.set_ylim(0, max(maior_freq, float(prob_teo.max())) * 1.1)
+
+        self.ax2.relim()
+        self.ax2.autoscale_view()
+
+    def renderizar(self, series, w_inch, h_inch):
+        """Atualiza os dados dos artistas e devolve a figura como Surface (compartilha o buffer Agg)"""
+        self._atualizar(series, w_inch, h_inch)
+        self.canvas.draw()
+        self._buffer = self.canvas.buffer_rgba()
+        largura, altura = self.canvas.get_width_height()
+        return pygame.image.frombuffer(self._buffer, (largura, altura), 'RGBA')
+
+    def renderizar_rgba(self, series, w_inch, h_inch):
+        """Como renderizar, mas devolve uma cópia dos pixels RGBA e o tamanho (seguro entre threads)"""
+        self._atualizar(series, w_inch, h_inch)
+        self.canvas.draw()
+        return bytes(self.canvas.buffer_rgba()), self.canvas.get_width_height()
+
+    @classmethod
+    def exportar(cls, series, caminho, w_inch=8, h_inch=4, dpi=200):
+        """Salva os gráficos em alta qualidade numa figura própria (nenhuma figura da tela é tocada)"""
+        exportador = cls()
+        exportador._atualizar(series, w_inch, h_inch)
+        exportador.fig.savefig(caminho, dpi=dpi, facecolor=COR_FUNDO_FIGURA,
+                               bbox_inches='tight', pad_inches=0.1)
+
+
+def _cor(hexa):
+    """Converte '#rrggbb' em tupla RGB"""
+    return tuple(int(hexa[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def _misturar(cor, fundo, alpha):
+    """Cor resultante de desenhar `cor` com transparência `alpha` sobre `fundo`"""
+    return tuple(int(c * alpha + f * (1 - alpha)) for c, f in zip(cor, fundo))
+
+
+def _ticks(vmin, vmax, alvo=5):
+    """Valores 'redondos' (1, 2 ou 5 x 10^k) para marcar um eixo"""
+    if vmax <= vmin:
+        return [vmin]
+    bruto = (vmax - vmin) / alvo
+    potencia = 10 ** np.floor(np.log10(bruto))
+    passo = potencia * min((m for m in (1, 2, 5, 10) if m * potencia >= bruto))
+    inicio = np.ceil(vmin / passo) * passo
+    return list(np.arange(inicio, vmax + passo * 1e-9, passo))
+
+
+class GraficoPygame:
+    """Desenha os dois gráficos só com primitivas do pygame: rápido e sem matplotlib"""
+
+    C_FIGURA = _cor(COR_FUNDO_FIGURA)
+    C_EIXOS = _cor(COR_FUNDO_EIXOS)
+    C_GRADE = _misturar((128, 128, 128), _cor(COR_FUNDO_EIXOS), 0.3)
+    C_BRANCO = (255, 255, 255)
+
+    def __init__(self):
+        self.superficie = None
+        self.fonte_titulo = None
+        self.fonte_eixo = None
+
+    def _texto(self, fonte, texto, pos, ancora='topleft'):
+        surf = CACHE_TEXTO.render(fonte, texto, self.C_BRANCO)
+        rect = surf.get_rect(**{ancora: pos})
+        self.superficie.blit(surf, rect)
+
+    def _moldura(self, rect, titulo):
+        """Fundo, título e borda de um gráfico; devolve a área útil dos dados"""
+        area = pygame.Rect(rect.x + 38, rect.y + 24, rect.width - 46, rect.height - 44)
+        self._texto(self.fonte_titulo, titulo, (rect.centerx, rect.y + 4), 'midtop')
+        pygame.draw.rect(self.superficie, self.C_EIXOS, area)
+        return area
+
+    def _eixo_y(self, area, ymin, ymax, formato):
+        """Grade horizontal e rótulos do eixo Y; devolve a função valor -> pixel"""
+        def para_y(valor):
+            return area.bottom - (valor - ymin) / (ymax - ymin) * area.height
+
+        for valor in _ticks(ymin, ymax):
+            y = int(para_y(valor))
+            pygame.draw.line(self.superficie, self.C_GRADE, (area.left, y), (area.right, y))
+            self._texto(self.fonte_eixo, formato.format(valor), (area.left - 3, y), 'midright')
+        return para_y
+
+    def _legenda(self, area, itens):
+        """Caixa de legenda no canto superior direito: [(cor, texto)]"""
+        y = area.top + 4
+        for cor, texto in itens:
+            surf = CACHE_TEXTO.render(self.fonte_eixo, texto, self.C_BRANCO)
+            x = area.right - surf.get_width() - 6
+            pygame.draw.line(self.superficie, cor, (x - 14, y + surf.get_height() // 2),
+                             (x - 3, y + surf.get_height() // 2), 3)
+            self.superficie.blit(surf, (x, y))
+            y += surf.get_height() + 1
+
+    def _desenhar_distribuicao(self, rect, series):
+        area = self._moldura(rect, "Distribuição de Probabilidade")
+        valores = intervalo_eixo_x(series)
+        prob_teo = probabilidade_teorica(valores, fracao_dobrada(series))
+        freqs = {s['pid']: (s['contagens'][valores] / s['n'] if s['n'] else np.zeros(len(valores)))
+                 for s in series}
+        ymax = max([float(prob_teo.max())] + [float(f.max()) for f in freqs.values()]) * 1.1
+        xmin, xmax = valores[0] - 0.7, valores[-1] + 0.7
+
+        def para_x(valor):
+            return area.left + (valor - xmin) / (xmax - xmin) * area.width
+
+        para_y = self._eixo_y(area, 0, ymax, "{:.2f}")
+        passo_tick = 1 if len(valores) <= 20 else 2
+        for valor in valores:
+            x = int(para_x(valor))
+            if valor % passo_tick == 0:
+                pygame.draw.line(self.superficie, self.C_GRADE, (x, area.top), (x, area.bottom))
+                self._texto(self.fonte_eixo, str(valor), (x, area.bottom + 2), 'midtop')
+
+        pontos_teo = [(para_x(v), para_y(p)) for v, p in zip(valores, prob_teo)]
+        area_teo = pontos_teo + [(para_x(valores[-1]), area.bottom), (para_x(valores[0]), area.bottom)]
+        pygame.draw.polygon(self.superficie, _misturar(self.C_BRANCO, self.C_EIXOS, 0.2), area_teo)
+
+        for indice, serie in enumerate(series):
+            cor = _misturar(serie['cor'], self.C_EIXOS, 0.7)
+            offset, largura = posicao_barras(indice, len(series))
+            largura_barra = largura * area.width / (xmax - xmin)
+            for valor, freq in zip(valores, freqs[serie['pid']]):
+                if freq <= 0:
+                    continue
+                topo = para_y(freq)
+                pygame.draw.rect(self.superficie, cor,
+                                 (para_x(valor + offset) - largura_barra / 2, topo,
+                                  max(1, largura_barra), area.bottom - topo))
+
+        pygame.draw.lines(self.superficie, _misturar(self.C_BRANCO, self.C_EIXOS, 0.8), False, pontos_teo, 2)
+        pygame.draw.rect(self.superficie, self.C_BRANCO, area, 1)
+        self._legenda(area, [(self.C_BRANCO, "Teórico")] +
+                      [(s['cor'], f"J{s['pid']}") for s in series])
+
+    def _desenhar_convergencia(self, rect, series):
+        area = self._moldura(rect, "Lei dos Grandes Números")
+        media_teorica = media_lancamento(fracao_dobrada(series))
+        n_max = max([int(s['medias_x'][-1]) for s in series if len(s['medias_x'])] + [1])
+        valores = [media_teorica] + [float(np.min(s['medias_y'])) for s in series if len(s['medias_y'])] + \
+                  [float(np.max(s['medias_y'])) for s in series if len(s['medias_y'])]
+        folga = max(0.5, (max(valores) - min(valores)) * 0.05)
+        ymin, ymax = min(valores) - folga, max(valores) + folga
+        xmin, xmax = 1, max(2, n_max)
+
+        def para_x(valor):
+            return area.left + (valor - xmin) / (xmax - xmin) * area.width
+
+        para_y = self._eixo_y(area, ymin, ymax, "{:.1f}")
+        for valor in sorted({int(v) for v in _ticks(xmin, xmax) if v == int(v)}):
+            x = int(para_x(valor))
+            pygame.draw.line(self.superficie, self.C_GRADE, (x, area.top), (x, area.bottom))
+            self._texto(self.fonte_eixo, str(valor), (x, area.bottom + 2), 'midtop')
+
+        # Média teórica tracejada
+        y_teo = int(para_y(media_teorica))
+        for x in range(area.left, area.right, 10):
+            pygame.draw.line(self.superficie, _misturar(self.C_BRANCO, self.C_EIXOS, 0.7),
+                             (x, y_teo), (min(x + 6, area.right), y_teo), 2)
+
+        # Faixas de confiança translúcidas, por baixo das linhas e cortadas na área do gráfico
+        bandas = [s for s in series if len(s.get('banda_x', ())) >= 2]
+        if bandas and area.width > 0 and area.height > 0:
+            camada = pygame.Surface(area.size, pygame.SRCALPHA)
+            for serie in bandas:
+                xs = para_x(np.asarray(serie['banda_x'], dtype=float)) - area.left
+                contorno = np.concatenate((np.column_stack((xs, para_y(serie['banda_superior']))),
+                                           np.column_stack((xs, para_y(serie['banda_inferior'])))[::-1]))
+                contorno[:, 1] -= area.top
+                camada.fill((0, 0, 0, 0))
+                pygame.draw.polygon(camada, tuple(serie['cor']) + (60,), contorno.tolist())
+                self.superficie.blit(camada, area)
+
+        for serie in series:
+            medias = np.asarray(serie['medias_y'], dtype=float)
+            if len(medias) == 0:
+                continue
+            xs = para_x(np.asarray(serie['medias_x'], dtype=float))
+            ys = para_y(medias)
+            pontos = np.column_stack((xs, ys)).tolist()
+            if len(pontos) == 1:
+                pygame.draw.circle(self.superficie, serie['cor'], pontos[0], 2)
+            else:
+                pygame.draw.lines(self.superficie, serie['cor'], False, pontos, 2)
+
+        pygame.draw.rect(self.superficie, self.C_BRANCO, area, 1)
+        self._legenda(area, [(s['cor'], f"J{s['pid']}") for s in series] +
+                      [(self.C_BRANCO, f"Média Teórica = {media_teorica:.1f}")])
+
+    def renderizar(self, series, w_inch, h_inch):
+        """Redesenha os gráficos na mesma Surface, do mesmo tamanho da versão matplotlib"""
+        tamanho = (int((w_inch + 1) * 100), int(h_inch * 100))
+        if self.superficie is None or self.superficie.get_size() != tamanho:
+            self.superficie = pygame.Surface(tamanho)
+        if self.fonte_titulo is None:
+            self.fonte_titulo = pygame.font.SysFont('Arial', 12, bold=True)
+            self.fonte_eixo = pygame.font.SysFont('Arial', 10)
+
+        self.superficie.fill(self.C_FIGURA)
+        largura, altura = tamanho
+        meio = largura // 2
+        self._desenhar_distribuicao(pygame.Rect(0, 0, meio, altura), series)
+        self._desenhar_convergencia(pygame.Rect(meio, 0, largura - meio, altura), series)
+        return self.superficie
+
+
+def congelar_series(series):
+    """Cópia somente leitura das séries, para entregar a outra thread sem corrida com o jogo"""
+    copias = []
+    for serie in series:
+        copia = dict(serie)
+        for chave, valor in serie.items():
+            if isinstance(valor, np.ndarray):
+                valor = valor.copy()
+                valor.flags.writeable = False
+                copia[chave] = valor
+        copias.append(copia)
+    return tuple(copias)
+
+
+class GraficoEmSegundoPlano:
+    """Gera os gráficos do matplotlib em uma thread; só o pedido mais recente é atendido
+
+    pedir() substitui qualquer pedido ainda não iniciado, e o laço principal continua
+    mostrando a última imagem pronta até resultado() devolver uma nova.
+    """
+
+    def __init__(self, ao_concluir=None):
+        self.ao_concluir = ao_concluir
+        self.descartados = 0
+        self.concluidos = 0
+        self._condicao = threading.Condition()
+        self._pedido = None
+        self._pronto = None
+        self._parar = False
+        self._em_andamento = False
+        self._thread = None
+
+    @property
+    def ocupado(self):
+        with self._condicao:
+            return self._pedido is not None or self._em_andamento
+
+    def pedir(self, series, w_inch, h_inch):
+        with self._condicao:
+            if self._pedido is not None:
+                self.descartados += 1
+            self._pedido = (congelar_series(series), w_inch, h_inch)
+            self._condicao.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._trabalhar, name="graficos", daemon=True)
+            self._thread.start()
+
+    def resultado(self):
+        """Surface do último gráfico concluído desde a chamada anterior, ou None"""
+        with self._condicao:
+            pronto, self._pronto = self._pronto, None
+        if pronto is None:
+            return None
+        rgba, tamanho = pronto
+        return pygame.image.frombuffer(rgba, tamanho, 'RGBA')
+
+    def encerrar(self):
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _trabalhar(self):
+        # A figura pertence só a esta thread
+        renderizador = GraficoMatplotlib()
+        while True:
+            with self._condicao:
+                while self._pedido is None and not self._parar:
+                    self._condicao.wait()
+                if self._parar:
+                    return
+                pedido, self._pedido = self._pedido, None
+                self._em_andamento = True
+            try:
+                pronto = renderizador.renderizar_rgba(*pedido)
+            except Exception:
+                traceback.print_exc()
+                pronto = None
+            with self._condicao:
+                self._em_andamento = False
+                if pronto is not None:
+                    self._pronto = pronto
+                    self.concluidos += 1
+            if pronto is not None and self.ao_concluir:
+                self.ao_concluir()
+
+
+# Renderizadores disponíveis para o painel de gráficos
+MODOS_GRAFICO = {"matplotlib": GraficoMatplotlib, "pygame": GraficoPygame}
@@ -0,0 +1,139 @@
+"""Gravação da sessão em segundo plano: sequência de PNGs ou vídeo bruto (RGB24)
+
+O laço principal só copia os pixels da tela (pygame.image.tobytes, ~0,2 ms em 1150x720) e
+entrega o buffer a uma fila limitada; uma thread converte, codifica e grava. Se a fila estiver
+cheia o quadro é descartado e o intervalo entre capturas dobra, voltando à taxa normal quando
+o codificador alcança: a captura nunca espera pelo disco nem pela compressão.
+
+Os quadros são numerados sem buracos; quadros.csv guarda o instante de cada um, para
+reproduzir no ritmo certo mesmo com quadros descartados.
+"""
+import os
+import queue
+import struct
+import threading
+import traceback
+import zlib
+
+import numpy as np
+import pygame
+
+FPS_GRAVACAO = 30
+TAMANHO_FILA = 8
+# Com o codificador atrasado, no máximo um quadro a cada MAX_FATOR_INTERVALO intervalos
+MAX_FATOR_INTERVALO = 8
+# zlib libera o GIL enquanto comprime; o nível 1 dá conta de 30 quadros por segundo
+NIVEL_COMPRESSAO_PNG = 1
+FORMATOS_GRAVACAO = ("png", "bruto")
+
+
+def _bloco_png(tipo, dados):
+    return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+
+def codificar_png(rgb, nivel=NIVEL_COMPRESSAO_PNG):
+    """PNG RGB de 8 bits de um array (altura, largura, 3), com o filtro Sub em todas as linhas"""
+    altura, largura, _ = rgb.shape
+    linhas = np.empty((altura, largura * 3 + 1), dtype=np.uint8)
+    linhas[:, 0] = 1
+    filtrado = linhas[:, 1:].reshape(altura, largura, 3)
+    filtrado[:, 0] = rgb[:, 0]
+    np.subtract(rgb[:, 1:], rgb[:, :-1], out=filtrado[:, 1:])
+    cabecalho = struct.pack(">IIBBBBB", largura, altura, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _bloco_png(b"IHDR", cabecalho) +
+            _bloco_png(b"IDAT", zlib.compress(linhas.data, nivel)) + _bloco_png(b"IEND", b""))
+
+
+class GravadorSessao:
+    """Captura quadros a até `fps` por segundo e grava em `pasta` numa thread própria
+
+    formato "png": quadro_000000.png, ...; "bruto": video_<largura>x<altura>.rgb (um arquivo
+    por tamanho de janela), RGB24 sem cabeçalho.
+    """
+
+    def __init__(self, pasta, formato="png", fps=FPS_GRAVACAO, tamanho_fila=TAMANHO_FILA):
+        if formato not in FORMATOS_GRAVACAO:
+            raise ValueError(f"formato de gravação desconhecido: {formato}")
+        os.makedirs(pasta, exist_ok=True)
+        self.pasta = pasta
+        self.formato = formato
+        self.intervalo_ms = 1000 / fps
+        self.fator = 1
+        self.proxima_ms = None
+        self.inicio_ms = None
+        self.capturados = 0
+        self.descartados = 0
+        self.gravados = 0
+        self.erro = None
+        self._fila = queue.Queue(tamanho_fila)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._trabalhar, name="gravacao", daemon=True)
+        self._thread.start()
+
+    def capturar(self, superficie, agora_ms):
+        """Copia o quadro se chegou a hora; nunca bloqueia. True se o quadro entrou na fila"""
+        if self.erro is not None or self._parar.is_set():
+            return False
+        # Tolerância de 1/4 de intervalo: o relógio do laço (60 fps) não cai exatamente no horário
+        if self.proxima_ms is not None and agora_ms + self.intervalo_ms / 4 < self.proxima_ms:
+            return False
+        if self.inicio_ms is None:
+            self.inicio_ms = agora_ms
+        passo = self.intervalo_ms * self.fator
+        if self.proxima_ms is None or agora_ms - self.proxima_ms > passo:
+            self.proxima_ms = agora_ms + passo
+        else:
+            self.proxima_ms += passo
+
+        if self._fila.full():
+            self.descartados += 1
+            self.fator = min(self.fator * 2, MAX_FATOR_INTERVALO)
+            return False
+        quadro = (self.capturados, agora_ms - self.inicio_ms, superficie.get_size(),
+                  pygame.image.tobytes(superficie, 'RGBX'))
+        # Só esta thread põe na fila: se não estava cheia, há vaga
+        self._fila.put_nowait(quadro)
+        self.capturados += 1
+        if self.fator > 1 and self._fila.qsize() <= 1:
+            self.fator //= 2
+        return True
+
+    @property
+    def pendentes(self):
+        return self._fila.qsize()
+
+    def encerrar(self, esperar=True):
+        """Para de capturar; a thread grava o que ainda está na fila (esperar=True aguarda o fim)"""
+        self._parar.set()
+        if esperar:
+            self._thread.join()
+
+    def _trabalhar(self):
+        videos = {}
+        try:
+            with open(os.path.join(self.pasta, "quadros.csv"), "w", encoding="utf-8") as indice:
+                indice.write("quadro,tempo_ms,largura,altura\n")
+                while True:
+                    try:
+                        numero, tempo_ms, (largura, altura), dados = self._fila.get(timeout=0.1)
+                    except queue.Empty:
+                        if self._parar.is_set():
+                            break
+                        continue
+                    rgb = np.frombuffer(dados, dtype=np.uint8).reshape(altura, largura, 4)[:, :, :3]
+                    if self.formato == "png":
+                        with open(os.path.join(self.pasta, f"quadro_{numero:06d}.png"), "wb") as arq:
+                            arq.write(codificar_png(rgb))
+                    else:
+                        if (largura, altura) not in videos:
+                            videos[largura, altura] = open(
+                                os.path.join(self.pasta, f"video_{largura}x{altura}.rgb"), "ab")
+                        videos[largura, altura].write(np.ascontiguousarray(rgb).data)
+                    indice.write(f"{numero},{tempo_ms:.0f},{largura},{altura}\n")
+                    self.gravados += 1
+        except Exception as erro:
+            traceback.print_exc()
+            self.erro = erro
+        finally:
+            for arquivo in videos.values():
+                arquivo.close()
@@ -0,0 +1,247 @@
+"""Históricos dos lançamentos em arrays NumPy tipados, com memória limitada
+
+Os lançamentos guardam só uma janela dos mais recentes (as estatísticas completas já
+estão nos histogramas de EstatisticasIncrementais); a média acumulada cobre a sessão
+inteira, mas passa a ser amostrada com passo maior quando o buffer enche.
+"""
+import math
+import time
+
+import numpy as np
+
+from estatisticas import Z_95
+
+# Pontos desenhados no gráfico de convergência, qualquer que seja o tamanho da sessão
+MAX_PONTOS_GRAFICO = 2000
+
+# Faixa de confiança da média acumulada: reamostragens do bootstrap (em lotes), razão entre
+# pontos consecutivos (só recalcula quando n cresce 15%) e lançamentos antes do primeiro ponto
+NIVEL_CONFIANCA = 0.95
+REAMOSTRAGENS = 1000
+LOTE_REAMOSTRAGENS = 250
+RAZAO_PONTOS_BANDA = 1.15
+MIN_LANCAMENTOS_BANDA = 5
+
+
+class BufferJanela:
+    """Últimos `capacidade` valores em um array tipado: cresce dobrando e, cheio, sobrescreve os mais antigos"""
+
+    def __init__(self, dtype=np.uint8, forma=(), capacidade=1 << 20, inicial=1024):
+        self.capacidade = capacidade
+        self.dados = np.empty((min(inicial, capacidade),) + tuple(forma), dtype=dtype)
+        self.total = 0
+
+    def limpar(self):
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacidade)
+
+    def _garantir(self, necessario):
+        """Cresce o array até caber `necessario` itens (limitado à capacidade)"""
+        atual = len(self.dados)
+        if necessario <= atual or atual == self.capacidade:
+            return
+        novo = min(self.capacidade, max(necessario, atual * 2))
+        dados = np.empty((novo,) + self.dados.shape[1:], dtype=self.dados.dtype)
+        dados[:self.total] = self.dados[:self.total]
+        self.dados = dados
+
+    def adicionar(self, valor):
+        self._garantir(self.total + 1)
+        self.dados[self.total % self.capacidade] = valor
+        self.total += 1
+
+    def estender(self, valores):
+        valores = np.asarray(valores, dtype=self.dados.dtype)
+        m = len(valores)
+        if m == 0:
+            return
+        self._garantir(self.total + m)
+        if m >= self.capacidade:
+            # Só os últimos cabem; ficam alinhados com a posição circular de self.total + m
+            valores = valores[-self.capacidade:]
+            inicio = (self.total + m - self.capacidade) % self.capacidade
+        else:
+            inicio = self.total % self.capacidade
+        fim = inicio + len(valores)
+        if fim <= self.capacidade:
+            self.dados[inicio:fim] = valores
+        else:
+            corte = self.capacidade - inicio
+            self.dados[inicio:] = valores[:corte]
+            self.dados[:fim - self.capacidade] = valores[corte:]
+        self.total += m
+
+    def valores(self):
+        """Valores guardados em ordem cronológica (visão sem cópia enquanto o buffer não deu a volta)"""
+        if self.total <= self.capacidade:
+            return self.dados[:self.total]
+        inicio = self.total % self.capacidade
+        return np.concatenate((self.dados[inicio:], self.dados[:inicio]))
+
+    def ultimo(self):
+        return self.dados[(self.total - 1) % self.capacidade] if self.total else None
+
+
+class HistoricoMedias:
+    """Média acumulada após cada lançamento em float32; cheio, descarta metade dos pontos e dobra o passo
+
+    Como BufferJanela, o array começa pequeno e cresce dobrando até a capacidade.
+    """
+
+    def __init__(self, capacidade=1 << 18, inicial=1024):
+        self.capacidade = capacidade
+        self.medias = np.empty(min(inicial, capacidade), dtype=np.float32)
+        self.n_pontos = 0
+        self.passo = 1
+        self.total = 0
+        self.ultima = None
+
+    def limpar(self):
+        self.n_pontos = 0
+        self.passo = 1
+        self.total = 0
+        self.ultima = None
+
+    def __len__(self):
+        return self.total
+
+    def _garantir(self, necessario):
+        """Cresce o array até caber `necessario` pontos; False se não cabem nem na capacidade"""
+        atual = len(self.medias)
+        if necessario <= atual:
+            return True
+        if necessario > self.capacidade:
+            return False
+        medias = np.empty(min(self.capacidade, max(necessario, atual * 2)), dtype=np.float32)
+        medias[:self.n_pontos] = self.medias[:self.n_pontos]
+        self.medias = medias
+        return True
+
+    def _compactar(self):
+        """Fica com um ponto a cada dois: o ponto i passa a valer o lançamento 1 + i * passo"""
+        metade = self.medias[:self.n_pontos:2]
+        self.n_pontos = len(metade)
+        self.medias[:self.n_pontos] = metade
+        self.passo *= 2
+
+    def adicionar(self, media):
+        self.ultima = media
+        self.total += 1
+        if (self.total - 1) % self.passo:
+            return
+        if not self._garantir(self.n_pontos + 1):
+            self._compactar()
+            if (self.total - 1) % self.passo:
+                return
+        self.medias[self.n_pontos] = media
+        self.n_pontos += 1
+
+    def estender(self, medias):
+        """Acrescenta as médias de lançamentos consecutivos de uma vez"""
+        if len(medias) == 0:
+            return
+        ultima = float(medias[-1])
+        medias = np.asarray(medias, dtype=np.float32)
+        while True:
+            deslocamento = (-self.total) % self.passo
+            escolhidas = medias[deslocamento::self.passo]
+            if self._garantir(self.n_pontos + len(escolhidas)):
+                break
+            self._compactar()
+        self.medias[self.n_pontos:self.n_pontos + len(escolhidas)] = escolhidas
+        self.n_pontos += len(escolhidas)
+        self.total += len(medias)
+        self.ultima = ultima
+
+    def pontos(self, max_pontos=MAX_PONTOS_GRAFICO):
+        """(x, média) prontos para o gráfico, com no máximo ~max_pontos pontos"""
+        xs = 1 + np.arange(self.n_pontos) * self.passo
+        ys = self.medias[:self.n_pontos]
+        if self.total and xs[-1] != self.total:
+            xs = np.append(xs, self.total)
+            ys = np.append(ys, np.float32(self.ultima))
+        return decimar_min_max(xs, ys, max_pontos)
+
+
+def decimar_min_max(xs, ys, max_pontos=MAX_PONTOS_GRAFICO):
+    """Reduz a série a mínimo e máximo de cada faixa, preservando picos e o último ponto"""
+    n = len(ys)
+    if n <= max_pontos:
+        return xs, ys
+    faixas = max(1, (max_pontos - 1) // 2)
+    tamanho = n // faixas
+    blocos = ys[:faixas * tamanho].reshape(faixas, tamanho)
+    base = np.arange(faixas) * tamanho
+    indices = np.unique(np.concatenate((base + blocos.argmin(axis=1), base + blocos.argmax(axis=1), [n - 1])))
+    return xs[indices], ys[indices]
+
+
+class BandaConfianca:
+    """Faixa de confiança da média acumulada, por bootstrap, recalculada só em marcos geométricos de n
+
+    Reamostrar os n lançamentos com reposição equivale a sortear as contagens do histograma
+    de uma multinomial; cada reamostragem custa O(valores possíveis), qualquer que seja n.
+    Se o prazo acabar no meio do bootstrap, o ponto usa a aproximação normal (média ± z·s/√n).
+    """
+
+    def __init__(self, semente=None, reamostragens=REAMOSTRAGENS, razao=RAZAO_PONTOS_BANDA):
+        self.rng = np.random.default_rng(semente)
+        self.reamostragens = reamostragens
+        self.razao = razao
+        self.limpar()
+
+    def limpar(self):
+        self.xs = []
+        self.inferior = []
+        self.superior = []
+        self.por_bootstrap = []
+        self.proximo = MIN_LANCAMENTOS_BANDA
+
+    def __len__(self):
+        return len(self.xs)
+
+    def atualizar(self, estatisticas, prazo=None):
+        """Acrescenta o ponto de n = estatisticas.n se passou do próximo marco; True se acrescentou
+
+        `prazo` (time.perf_counter) limita o tempo gasto no bootstrap.
+        """
+        n = estatisticas.n
+        if self.xs and n < self.xs[-1]:  # estatísticas reiniciadas
+            self.limpar()
+        if n < self.proximo:
+            return False
+        faixa = self._bootstrap(estatisticas, prazo)
+        self.por_bootstrap.append(faixa is not None)
+        if faixa is None:
+            faixa = self._normal(estatisticas)
+        self.xs.append(n)
+        self.inferior.append(faixa[0])
+        self.superior.append(faixa[1])
+        self.proximo = max(n + 1, math.ceil(n * self.razao))
+        return True
+
+    def _bootstrap(self, estatisticas, prazo):
+        """Quantis das médias reamostradas, ou None se o prazo acabar antes"""
+        n = estatisticas.n
+        valores = np.arange(len(estatisticas.contagens))
+        probabilidades = estatisticas.contagens / n
+        medias = []
+        for inicio in range(0, self.reamostragens, LOTE_REAMOSTRAGENS):
+            if prazo is not None and time.perf_counter() > prazo:
+                return None
+            lote = min(LOTE_REAMOSTRAGENS, self.reamostragens - inicio)
+            medias.append(self.rng.multinomial(n, probabilidades, size=lote) @ valores / n)
+        alfa = (1 - NIVEL_CONFIANCA) / 2
+        inferior, superior = np.quantile(np.concatenate(medias), (alfa, 1 - alfa))
+        return float(inferior), float(superior)
+
+    @staticmethod
+    def _normal(estatisticas):
+        erro = Z_95 * math.sqrt(estatisticas.variancia / estatisticas.n)
+        return estatisticas.media - erro, estatisticas.media + erro
+
+    def pontos(self):
+        """(x, limite inferior, limite superior) prontos para o gráfico"""
+        return np.array(self.xs), np.array(self.inferior), np.array(self.superior)
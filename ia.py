@@ -0,0 +1,201 @@
+"""Oponente do computador: busca em árvore Monte Carlo (MCTS) para decidir quando usar o poder
+
+A árvore é de malha aberta: cada nó é uma sequência de decisões da IA ("esperar" em cada
+uma das suas próximas vezes, até "usar") e os dados são sorteados de novo a cada playout.
+Depois de usar o poder não há mais o que decidir, então a folha "usar na k-ésima vez" é
+uma política fixa e os playouts de cada folha rodam em lote com NumPy, como em simulacao.py.
+A busca é refeita a cada vez da IA, a partir do instantâneo da partida.
+
+Nos playouts os oponentes usam o poder na primeira vez que jogam (o padrão de simulacao.py).
+"""
+import math
+import time
+
+import numpy as np
+
+from regras import (PODERES, PODER_DOBRAR, PODER_RETROCEDER, PODER_TROCAR, PODER_JOGAR_NOVAMENTE,
+                    RECUO_RETROCEDER, tabela_destinos)
+
+# Orçamento de cada decisão e tamanho do lote de playouts avaliado em cada folha
+TEMPO_DECISAO_MS = 60
+PLAYOUTS_POR_LOTE = 256
+# Vezes futuras representadas na árvore; além disso a IA usa o poder ao acaso nos playouts
+MAX_PROFUNDIDADE = 12
+PROB_USO_PLAYOUT = 0.25
+# Constante de exploração do UCB1
+EXPLORACAO = 0.5
+# Playouts por poder ao escolher o poder no início
+PLAYOUTS_ESCOLHA = 4096
+
+
+def simular_playouts(inst, meta, destinos, ia, disparo, n, rng, aleatorio=False, max_lancamentos=1000):
+    """Joga n partidas a partir do instantâneo e devolve quantas a IA (índice `ia`, base 0) venceu
+
+    A IA usa o poder antes do seu lançamento número `disparo` a partir de agora (0 = já) ou, com
+    `aleatorio`, ao acaso (probabilidade PROB_USO_PLAYOUT) em cada vez a partir dessa.
+    """
+    n_jog = len(inst.posicoes)
+    pos = np.tile(inst.posicoes, (n, 1))
+    poder = inst.poder_jogadores
+    usado = np.tile(inst.poder_usado | (poder < 0), (n, 1))
+    turno = np.full(n, inst.turno_atual - 1, dtype=np.int64)
+    dobrar = np.full(n, bool(inst.poder_dobrar_ativa))
+    extra = np.full(n, bool(inst.turno_extra))
+    vezes_ia = np.zeros(n, dtype=np.int64)
+    vencedor = np.full(n, -1, dtype=np.int64)
+
+    ativos = np.arange(n)
+    for _ in range(max_lancamentos):
+        if ativos.size == 0:
+            break
+        for jogador in range(n_jog):
+            da_vez = ativos[(turno[ativos] == jogador) & ~usado[ativos, jogador]]
+            if da_vez.size == 0:
+                continue
+            if jogador != ia:
+                disparar = da_vez
+            elif aleatorio:
+                disparar = da_vez[(vezes_ia[da_vez] >= disparo) & (rng.random(da_vez.size) < PROB_USO_PLAYOUT)]
+            else:
+                disparar = da_vez[vezes_ia[da_vez] == disparo]
+            if disparar.size:
+                _aplicar_poder(disparar, jogador, int(poder[jogador]), pos, usado, dobrar, extra)
+
+        t = turno[ativos]
+        soma = rng.integers(1, 7, size=(ativos.size, 2)).sum(axis=1)
+        soma = np.where(dobrar[ativos], soma * 2, soma)
+        dobrar[ativos] = False
+
+        # Casas especiais só valem na posição de chegada, como em PartidaCorrida
+        nova = destinos[np.minimum(pos[ativos, t] + soma, meta)]
+        venceu = nova >= meta - 1
+        pos[ativos, t] = np.minimum(nova, meta - 1)
+        vezes_ia[ativos] += t == ia
+        vencedor[ativos[venceu]] = t[venceu]
+
+        turno[ativos] = np.where(extra[ativos], t, (t + 1) % n_jog)
+        extra[ativos] = False
+        ativos = ativos[~venceu]
+
+    return int((vencedor == ia).sum())
+
+
+def _aplicar_poder(ids, jogador, poder, pos, usado, dobrar, extra):
+    """Efeito de usar_poder nas partidas `ids` (alvo: o oponente mais adiantado, como oponente_alvo)"""
+    usado[ids, jogador] = True
+    if poder == PODER_DOBRAR:
+        dobrar[ids] = True
+    elif poder == PODER_JOGAR_NOVAMENTE:
+        extra[ids] = True
+    else:
+        n_jog = pos.shape[1]
+        ordem = (jogador + 1 + np.arange(n_jog - 1)) % n_jog
+        alvo = ordem[pos[ids][:, ordem].argmax(axis=1)]
+        if poder == PODER_RETROCEDER:
+            pos[ids, alvo] = np.maximum(0, pos[ids, alvo] - RECUO_RETROCEDER)
+        elif poder == PODER_TROCAR:
+            proprio = pos[ids, jogador].copy()
+            pos[ids, jogador] = pos[ids, alvo]
+            pos[ids, alvo] = proprio
+
+
+class No:
+    """Nó da árvore: a IA esperou `profundidade` vezes; filhos = usar agora / esperar mais uma vez"""
+
+    __slots__ = ('profundidade', 'visitas', 'vitorias', 'usar', 'esperar')
+
+    def __init__(self, profundidade):
+        self.profundidade = profundidade
+        self.visitas = 0
+        self.vitorias = 0
+        self.usar = None
+        self.esperar = None
+
+    def taxa(self):
+        return self.vitorias / self.visitas if self.visitas else 0.0
+
+
+class JogadorIA:
+    """Decide, na vez do jogador controlado pelo computador, se usa o poder antes de lançar"""
+
+    def __init__(self, jogador_id, semente=None, tempo_ms=TEMPO_DECISAO_MS):
+        self.jogador_id = jogador_id
+        self.tempo_ms = tempo_ms
+        self.rng = np.random.default_rng(semente)
+        self._destinos = {}
+        # Estatísticas da última busca
+        self.playouts = 0
+        self.duracao_ms = 0.0
+        self.chance_usar = self.chance_esperar = None
+
+    def _tabela(self, partida):
+        if partida.meta not in self._destinos:
+            self._destinos[partida.meta] = tabela_destinos(partida.meta, partida.casas_especiais)
+        return self._destinos[partida.meta]
+
+    def decidir(self, partida):
+        """True se a IA deve usar o poder agora (antes do lançamento desta vez)"""
+        self.playouts = 0
+        self.chance_usar = self.chance_esperar = None
+        i = self.jogador_id - 1
+        if partida.poder_jogadores[i] < 0 or partida.poder_usado[i]:
+            return False
+        inicio = time.perf_counter()
+        inst = partida.instantaneo()
+        meta, destinos = partida.meta, self._tabela(partida)
+
+        raiz = No(0)
+        limite = inicio + self.tempo_ms / 1000
+        while True:
+            caminho = [raiz]
+            no = raiz
+            while True:
+                # Expande primeiro "usar" e "esperar"; depois escolhe por UCB1
+                if no.usar is None:
+                    no.usar = No(no.profundidade)
+                    folha = no.usar
+                    break
+                if no.esperar is None and no.profundidade < MAX_PROFUNDIDADE:
+                    no.esperar = No(no.profundidade + 1)
+                    folha = no.esperar
+                    break
+                if no.esperar is None or self._ucb(no, no.usar) >= self._ucb(no, no.esperar):
+                    folha = no.usar
+                    break
+                no = no.esperar
+                caminho.append(no)
+            # "usar": política fixa; "esperar": a partir dessa vez, a política aleatória dos playouts
+            vitorias = simular_playouts(inst, meta, destinos, i, folha.profundidade, PLAYOUTS_POR_LOTE,
+                                        self.rng, aleatorio=folha is not no.usar)
+            self.playouts += PLAYOUTS_POR_LOTE
+            for visitado in caminho + [folha]:
+                visitado.visitas += PLAYOUTS_POR_LOTE
+                visitado.vitorias += vitorias
+            if time.perf_counter() >= limite:
+                break
+
+        self.duracao_ms = (time.perf_counter() - inicio) * 1000
+        self.chance_usar = raiz.usar.taxa()
+        self.chance_esperar = raiz.esperar.taxa() if raiz.esperar else None
+        # Filho mais visitado (o mais robusto)
+        return raiz.esperar is None or raiz.usar.visitas >= raiz.esperar.visitas
+
+    @staticmethod
+    def _ucb(pai, filho):
+        return filho.taxa() + EXPLORACAO * math.sqrt(math.log(pai.visitas) / filho.visitas)
+
+    def escolher_poder(self, partida):
+        """Poder com mais vitórias em playouts a partir do estado atual (poderes ainda não escolhidos contam como nenhum)"""
+        inst = partida.instantaneo()
+        meta, destinos = partida.meta, self._tabela(partida)
+        inst.estado = "jogando"
+        inst.turno_atual = 1
+        melhor, melhor_vitorias = 0, -1
+        for indice in range(len(PODERES)):
+            inst.poder_jogadores = partida.poder_jogadores.copy()
+            inst.poder_jogadores[self.jogador_id - 1] = indice
+            vitorias = simular_playouts(inst, meta, destinos, self.jogador_id - 1, 0, PLAYOUTS_ESCOLHA,
+                                        self.rng, aleatorio=True)
+            if vitorias > melhor_vitorias:
+                melhor, melhor_vitorias = indice, vitorias
+        return melhor
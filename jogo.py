@@ -1,16 +1,56 @@
 import pygame
-import numpy as np
-import matplotlib.pyplot as plt
-import random
-import io
 import sys
 import os
+import argparse
+import math
+import time
+
+import numpy as np
+
+from regras import PartidaCorrida, CORES_JOGADORES, META, MIN_JOGADORES, MAX_JOGADORES
+from graficos import GraficoMatplotlib, GraficoEmSegundoPlano, MODOS_GRAFICO
+from cache_texto import CACHE_TEXTO
+from cache_tamanho import CachePorTamanho
+from markov import CadeiaEmSegundoPlano, chances_partida, modelavel
+from registro import RegistroPartida, MAX_SEMENTE
+from perfil import Perfilador, ETAPAS
+from ia import JogadorIA
+from sprites import AtlasSprites
+from historico import BandaConfianca
+from gravacao import GravadorSessao, FORMATOS_GRAVACAO
+
+# Modo turbo: lançamentos por segundo e intervalo entre lotes (estatísticas e gráficos
+# são atualizados no máximo 4 vezes por segundo)
+ROLAGENS_TURBO_POR_SEGUNDO = 20_000
+INTERVALO_TURBO_MS = 250
+
+# Pausa antes de cada ação do computador, para dar tempo de acompanhar
+ATRASO_IA_MS = 700
 
-# Configurar matplotlib para renderizar em memória (backend Agg)
-plt.switch_backend('Agg')
+# Cliques mais próximos que isso do anterior são ignorados (debounce sem dormir)
+INTERVALO_CLIQUE_MS = 150
 
-class CorridaEstatistica:
-    def __init__(self):
+# Redimensionamento: o layout só é refeito quando a janela fica esse tempo sem mudar de tamanho
+INTERVALO_REDIMENSIONAR_MS = 200
+
+# Tudo que depende do tamanho da janela e é guardado por tamanho em self.layouts
+CAMPOS_LAYOUT = ('rects_casas', 'centros_casas', 'tamanho_casa', 'vagas_peoes', 'raio_peao',
+                 'camada_tabuleiro', 'camada_painel')
+
+# Tempo máximo do bootstrap das faixas de confiança em cada atualização do gráfico (todos os jogadores);
+# estourado, os pontos restantes usam a aproximação normal
+ORCAMENTO_BANDA_MS = 8
+
+# Postado pela thread dos gráficos quando uma imagem nova fica pronta (acorda o laço ocioso)
+EVENTO_GRAFICO_PRONTO = pygame.USEREVENT + 1
+# Postado quando a cadeia de Markov de um tabuleiro fica resolvida
+EVENTO_CHANCES_PRONTAS = pygame.USEREVENT + 2
+
+class CorridaEstatistica(PartidaCorrida):
+    def __init__(self, modo_grafico="matplotlib", modo_redesenho="sujo", semente=None,
+                 reproducao=None, velocidade_reproducao=10, caminho_registro=None, grafico_assincrono=True,
+                 n_jogadores=2, casas=META, ia=(), mostrar_banda=False,
+                 formato_gravacao="png"):
         pygame.init()
         
         # --- CONFIGURAÇÕES DE TELA ---
@@ -25,8 +65,7 @@ class CorridaEstatistica:
         self.C_CASA_SORTE = (80, 200, 120)
         self.C_CASA_AZAR = (220, 90, 90)
         self.C_BORDA = (80, 80, 100)
-        self.C_JOGADOR1 = (255, 100, 100)
-        self.C_JOGADOR2 = (80, 180, 255)
+        self.C_JOGADOR1, self.C_JOGADOR2 = CORES_JOGADORES[:2]
         self.C_TEXTO = (240, 240, 240)
         self.C_DESTAQUE = (255, 215, 0)
         self.C_BOTAO = (60, 140, 200)
@@ -40,275 +79,193 @@ class CorridaEstatistica:
         self.fonte_mini = pygame.font.SysFont('Arial', 12)
         
         # --- LÓGICA DO JOGO ---
-        self.meta = 30
-        self.jogadores = {
-            1: {'pos': 0, 'dados': [], 'cor': self.C_JOGADOR1, 'nome': 'Jogador 1', 'poder': None, 'poder_usado': False},
-            2: {'pos': 0, 'dados': [], 'cor': self.C_JOGADOR2, 'nome': 'Jogador 2', 'poder': None, 'poder_usado': False}
-        }
-        self.turno_atual = 1
-        self.vencedor = None
-        self.historico_medias = {1: [], 2: []}
-        self.historico_lancamentos = {1: [], 2: []}
-        
-        # Estados de exibição
-        self.msg_evento = ""
-        self.timer_evento = 0
-        self.ultimo_lancamento = (0, 0)
-        self.ultimo_resultado_soma = 0
-        self.timer_dados_visiveis = 0
-        
-        # Cache da imagem do gráfico
+        if reproducao:
+            semente, n_jogadores, casas = reproducao.semente, reproducao.n_jogadores, reproducao.meta
+        PartidaCorrida.__init__(self, semente=semente, n_jogadores=n_jogadores, meta=casas)
+        # Reprodução de um registro gravado (eventos por segundo; 0 = tudo de uma vez)
+        self.reproducao = reproducao
+        self.indice_reproducao = 0
+        self.velocidade_reproducao = velocidade_reproducao
+        self.credito_reproducao = 0.0
+        self.caminho_registro = caminho_registro
+        # Modo turbo (tecla T): lotes de lançamentos só para as estatísticas
+        self.turbo = False
+        self.credito_turbo_ms = 0.0
+        # Jogadores controlados pelo computador (na reprodução as jogadas vêm do registro)
+        self.ia = {} if reproducao else {pid: JogadorIA(pid, semente=self.semente + pid)
+                                         for pid in ia if pid in self.ids_jogadores}
+        for pid in self.ia:
+            self.jogadores[pid]['nome'] = f"Computador {pid}"
+        self.credito_ia_ms = 0.0
+        
+        # Cache da imagem do gráfico (altura_grafico: altura em pixels do último pedido)
         self.img_grafico_cache = None
-        self.dados_para_grafico_atualizados = False
-        
-        # Sistema de poderes
-        self.poderes_disponiveis = [
-            {"nome": "Dobrar Dados", "descricao": "Próximo lançamento é dobrado", "cor": (255, 150, 50)},
-            {"nome": "Retroceder Oponente", "descricao": "Oponente volta 3 casas", "cor": (200, 80, 80)},
-            {"nome": "Trocar Posições", "descricao": "Troca de lugar com oponente", "cor": (150, 100, 200)},
-            {"nome": "Jogar Novamente", "descricao": "Joga os dados novamente", "cor": (80, 180, 120)}
-        ]
+        self.rect_grafico = None
+        self.altura_grafico = None
+        # Renderizadores de gráfico criados sob demanda ("matplotlib" ou "pygame")
+        self.modo_grafico = modo_grafico
+        self.graficos = {}
+        # matplotlib fora da thread principal: o laço segue mostrando a última imagem pronta
+        self.grafico_assincrono = grafico_assincrono
+        self.grafico_em_segundo_plano = None
+        # Faixa de 95% da média acumulada (tecla B mostra/esconde); escondida, nenhum bootstrap é feito
+        self.mostrar_banda = mostrar_banda
+        self.bandas = {pid: BandaConfianca(semente=(self.semente, pid)) for pid in self.ids_jogadores}
+        # Textos renderizados (LRU compartilhado)
+        self.cache_texto = CACHE_TEXTO
+        # Chances exatas (cadeia de Markov, resolvida em outra thread), recalculadas só quando o estado muda
+        self.cadeias = CadeiaEmSegundoPlano(
+            ao_concluir=lambda: pygame.event.post(pygame.event.Event(EVENTO_CHANCES_PRONTAS)))
+        self.chave_chances = None
+        self.texto_chances = ""
+        # O tabuleiro não muda durante a sessão: a cadeia começa a ser resolvida já no menu,
+        # e fica pronta antes do primeiro quadro da partida
+        if modelavel(self):
+            self.cadeias.obter(self.meta, self.casas_especiais)
         
-        # Estados do jogo
-        self.estado = "menu"
-        self.jogador_selecionando_poder = 1
+        # Redesenho: "sujo" atualiza só as regiões que mudaram e dorme quando ocioso;
+        # "completo" redesenha e vira a tela inteira a cada quadro
+        self.modo_redesenho = modo_redesenho
+        self.tela_inteira_suja = True
+        self.regioes_sujas = []
+        self.assinatura_anterior = None
+        self.rects_peoes = []
+        self.hover_botoes = {}
+
+        # Entrada por eventos: botões do último quadro composto, como (rect, ação), e a tela em que foram desenhados
+        self.botoes = []
+        self.estado_botoes = None
+        self.pos_mouse = pygame.mouse.get_pos()
+        self.ultimo_clique_ms = -INTERVALO_CLIQUE_MS
+        self.pedido_saida = False
+
+        # Perfil do laço principal (F3 mostra, F4 exporta CSV); desligado não mede nada
+        self.perfil = Perfilador()
+
+        # Gravação da sessão (F9): captura no laço, codificação em outra thread
+        self.formato_gravacao = formato_gravacao
+        self.gravador = None
+        self.gravacoes = []
+
+        # Dados e peões pré-renderizados (um atlas por escala)
+        self.sprites = AtlasSprites()
+
+        # Camadas estáticas pré-renderizadas: (superfície, posição)
+        self.camada_tabuleiro = None
+        self.camada_painel = None
 
-        # Casas Especiais
-        self.casas_especiais = {
-            3: ("SORTE", 2, "Atalho! +2"), 8: ("SORTE", 3, "Vento! +3"),
-            12: ("SORTE", 1, "Passo! +1"), 18: ("SORTE", 2, "Escada! +2"),
-            22: ("SORTE", 4, "Jato! +4"), 28: ("SORTE", 1, "Quase! +1"),
-            4: ("AZAR", 2, "Queda! -2"), 7: ("AZAR", 3, "Buraco! -3"),
-            11: ("AZAR", 1, "Ops! -1"), 14: ("AZAR", 2, "Volta! -2"),
-            17: ("AZAR", 4, "Crise! -4"), 21: ("AZAR", 2, "Recuo! -2"),
-            26: ("AZAR", 3, "Monstro! -3")
-        }
+        # Redimensionamento adiado: enquanto a janela é arrastada mostra o último quadro escalado
+        self.layouts = CachePorTamanho()
+        self.tamanho_pendente = None
+        self.redimensionado_em = 0
+        self.quadro_base_previa = None
+        self.previa = None
 
         # Gerar Tabuleiro
         self.rects_casas = []
         self._gerar_layout_tabuleiro()
 
     def _gerar_layout_tabuleiro(self):
-        """Gera o layout Zig-Zag ajustado"""
+        """Gera o layout Zig-Zag ajustado: grade calculada para o número de casas e a área livre"""
         self.rects_casas = []
+        self.camada_tabuleiro = None
+        self.camada_painel = None
         
         painel_w = 380
         margem_esquerda_extra = 120 
         area_x_offset = painel_w + margem_esquerda_extra
         area_y_offset = 50
         
-        area_w = self.largura_tela - area_x_offset - 30
-        area_h = self.altura_tela - area_y_offset - 30
+        # Janelas menores que o painel deixam o tabuleiro com 1 pixel, em vez de área negativa
+        area_w = max(1, self.largura_tela - area_x_offset - 30)
+        area_h = max(1, self.altura_tela - area_y_offset - 30)
         
-        cols = 6
-        linhas = 5
+        # Colunas e linhas que deixam as células o mais perto possível de quadradas (6x5 para 30 casas)
+        cols = max(1, math.ceil(math.sqrt(self.meta * area_w / area_h)))
+        linhas = math.ceil(self.meta / cols)
         
         largura_celula = area_w / cols
         altura_celula = area_h / linhas
-        margem = 6
+        margem = 6 if min(largura_celula, altura_celula) >= 40 else 2
         
-        for i in range(self.meta):
-            linha = i // cols
-            coluna = i % cols
-            
-            if linha % 2 == 1:
-                coluna = (cols - 1) - coluna
-            
-            linha_visual = (linhas - 1) - linha
-            
-            x = area_x_offset + (coluna * largura_celula) + margem
-            y = area_y_offset + (linha_visual * altura_celula) + margem
-            w = largura_celula - (margem * 2)
-            h = altura_celula - (margem * 2)
-            
+        # Geometria pré-calculada em arrays: linha, coluna e canto de cada casa
+        indices = np.arange(self.meta)
+        linha = indices // cols
+        coluna = indices % cols
+        coluna = np.where(linha % 2 == 1, (cols - 1) - coluna, coluna)
+        linha_visual = (linhas - 1) - linha
+        xs = area_x_offset + coluna * largura_celula + margem
+        ys = area_y_offset + linha_visual * altura_celula + margem
+        w = max(1, largura_celula - (margem * 2))
+        h = max(1, altura_celula - (margem * 2))
+        
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
             r = pygame.Rect(x, y, w, h)
             self.rects_casas.append({'rect': r, 'id': i, 'center': r.center})
+        self.centros_casas = np.array([c['center'] for c in self.rects_casas], dtype=np.int64)
+        self.tamanho_casa = (int(w), int(h))
+        self._gerar_vagas_peoes()
+
+    def _gerar_vagas_peoes(self):
+        """Posição de cada peão dentro da casa (uma vaga fixa por jogador) e o raio dos peões"""
+        w, h = self.tamanho_casa
+        if self.n_jogadores == 2:
+            raio = max(4, min(12, int(min(w, h) / 5)))
+            passo = raio
+            self.vagas_peoes = np.array([(-passo, raio * 2 // 3), (passo, raio * 2 // 3)], dtype=np.int64)
+        else:
+            cols = math.ceil(math.sqrt(self.n_jogadores))
+            linhas = math.ceil(self.n_jogadores / cols)
+            passo = min(w / cols, h / linhas)
+            raio = max(3, min(12, int(passo / 2) - 2))
+            vagas = [((k % cols - (cols - 1) / 2) * passo, (k // cols - (linhas - 1) / 2) * passo)
+                     for k in range(self.n_jogadores)]
+            self.vagas_peoes = np.array(vagas).round().astype(np.int64)
+        self.raio_peao = raio
 
     def reiniciar(self):
-        self.jogadores[1]['pos'] = 0
-        self.jogadores[1]['dados'] = []
-        self.jogadores[1]['poder'] = None
-        self.jogadores[1]['poder_usado'] = False
-        self.jogadores[2]['pos'] = 0
-        self.jogadores[2]['dados'] = []
-        self.jogadores[2]['poder'] = None
-        self.jogadores[2]['poder_usado'] = False
-        self.turno_atual = 1
-        self.vencedor = None
-        self.historico_medias = {1: [], 2: []}
-        self.historico_lancamentos = {1: [], 2: []}
-        self.msg_evento = ""
-        self.ultimo_lancamento = (0, 0)
+        PartidaCorrida.reiniciar(self)
         self.img_grafico_cache = None
-        self.estado = "menu"
-        self.jogador_selecionando_poder = 1
-
-    def selecionar_poder(self, jogador_id, poder_index):
-        """Atribui um poder ao jogador"""
-        if 0 <= poder_index < len(self.poderes_disponiveis):
-            self.jogadores[jogador_id]['poder'] = self.poderes_disponiveis[poder_index]
-            self.jogadores[jogador_id]['poder_usado'] = False
-            
-            if jogador_id == 1:
-                self.jogador_selecionando_poder = 2
-            else:
-                self.estado = "jogando"
-
-    def usar_poder(self, jogador_id):
-        """Ativa o poder do jogador atual"""
-        jogador = self.jogadores[jogador_id]
-        oponente_id = 3 - jogador_id
-        
-        if jogador['poder'] is None or jogador['poder_usado']:
-            return False
-            
-        poder_nome = jogador['poder']['nome']
-        jogador['poder_usado'] = True
-        
-        if poder_nome == "Dobrar Dados":
-            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
-            self.poder_dobrar_ativa = True
-            
-        elif poder_nome == "Retroceder Oponente":
-            self.jogadores[oponente_id]['pos'] = max(0, self.jogadores[oponente_id]['pos'] - 3)
-            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
-            
-        elif poder_nome == "Trocar Posições":
-            pos_temp = jogador['pos']
-            jogador['pos'] = self.jogadores[oponente_id]['pos']
-            self.jogadores[oponente_id]['pos'] = pos_temp
-            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
-            
-        elif poder_nome == "Jogar Novamente":
-            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
-            self.turno_extra = True
-            
-        self.timer_evento = 120
-        return True
-
-    def jogar_dados(self):
-        if self.vencedor or self.estado != "jogando": 
-            return
-
-        jog = self.jogadores[self.turno_atual]
-        
-        d1 = random.randint(1, 6)
-        d2 = random.randint(1, 6)
-        soma = d1 + d2
-        
-        # Aplicar poder de dobrar dados se estiver ativo
-        if hasattr(self, 'poder_dobrar_ativa') and self.poder_dobrar_ativa:
-            soma = soma * 2
-            self.poder_dobrar_ativa = False
-            self.msg_evento = f"Dados dobrados! Movimento: {soma} casas"
-        else:
-            self.msg_evento = f"Movimento: {soma} casas"
-            
-        self.timer_evento = 90
-            
-        self.ultimo_lancamento = (d1, d2)
-        self.ultimo_resultado_soma = soma
-        self.timer_dados_visiveis = 90
-        
-        # Armazenar dados para estatísticas
-        jog['dados'].append(soma)
-        self.historico_lancamentos[self.turno_atual].append((d1, d2))
-        self.historico_medias[self.turno_atual].append(np.mean(jog['dados']))
-        self.dados_para_grafico_atualizados = True
-        
-        # MOVIMENTO CORRETO: usar o valor real da soma
-        movimento = soma
-        pos_antiga = jog['pos']
-        jog['pos'] += movimento
-        
-        # Verificar casas especiais apenas na posição final (evita recursão)
-        self._verificar_consequencias_final(jog['pos'])
-        
-        # Verificar vitória
-        if jog['pos'] >= self.meta - 1:
-            jog['pos'] = self.meta - 1
-            self.vencedor = self.turno_atual
-            self.msg_evento = f"{jog['nome']} VENCEU!"
-            self.estado = "fim"
-        
-        # Mudar turno (a menos que haja turno extra)
-        if not self.vencedor and not hasattr(self, 'turno_extra'):
-            self.turno_atual = 3 - self.turno_atual
-        elif hasattr(self, 'turno_extra'):
-            del self.turno_extra
-
-    def _verificar_consequencias_final(self, posicao):
-        """Verifica consequências apenas na posição final (evita recursão infinita)"""
-        if posicao >= self.meta:
-            return
-            
-        if posicao in self.casas_especiais:
-            tipo, valor, texto = self.casas_especiais[posicao]
-            jog = self.jogadores[self.turno_atual]
-            
-            self.msg_evento = f"{texto} na casa {posicao + 1}"
-            self.timer_evento = 120
-            
-            if tipo == "SORTE":
-                jog['pos'] += valor
-                self.msg_evento += f" (+{valor})"
-            elif tipo == "AZAR":
-                jog['pos'] = max(0, jog['pos'] - valor)
-                self.msg_evento += f" (-{valor})"
+        self.turbo = False
+        for banda in self.bandas.values():
+            banda.limpar()
+        # Gráficos guardados de outros tamanhos são da partida anterior
+        for layout in self.layouts.valores():
+            layout['grafico'] = None
 
     def _calcular_stats_texto(self, jogador_id):
-        dados = self.jogadores[jogador_id]['dados']
-        if not dados:
-            return "-", "-", "-"
-        media = np.mean(dados)
-        mediana = np.median(dados)
-        valores, contagens = np.unique(dados, return_counts=True)
-        indice_moda = np.argmax(contagens)
-        moda = valores[indice_moda]
-        return f"{media:.2f}", f"{mediana:.1f}", f"{moda}"
+        return self.estatisticas[jogador_id].texto()
 
     def _desenhar_dado_pontos(self, x, y, tamanho, valor):
-        rect = pygame.Rect(x, y, tamanho, tamanho)
-        pygame.draw.rect(self.tela, (10, 10, 10), (x+2, y+2, tamanho, tamanho), border_radius=8)
-        pygame.draw.rect(self.tela, (245, 245, 245), rect, border_radius=8)
-        pygame.draw.rect(self.tela, (20, 20, 20), rect, 2, border_radius=8)
-        
-        raio = tamanho // 9
-        cor_ponto = (0, 0, 0)
-        
-        cx, cy = x + tamanho//2, y + tamanho//2
-        tl_x, tl_y = x + tamanho//4, y + tamanho//4
-        tr_x, tr_y = x + 3*tamanho//4, y + tamanho//4
-        bl_x, bl_y = x + tamanho//4, y + 3*tamanho//4
-        br_x, br_y = x + 3*tamanho//4, y + 3*tamanho//4
-        ml_x, ml_y = x + tamanho//4, y + tamanho//2
-        mr_x, mr_y = x + 3*tamanho//4, y + tamanho//2
-        
-        pontos = []
-        if valor == 1: pontos = [(cx, cy)]
-        elif valor == 2: pontos = [(tl_x, tl_y), (br_x, br_y)]
-        elif valor == 3: pontos = [(tl_x, tl_y), (cx, cy), (br_x, br_y)]
-        elif valor == 4: pontos = [(tl_x, tl_y), (tr_x, tr_y), (bl_x, bl_y), (br_x, br_y)]
-        elif valor == 5: pontos = [(tl_x, tl_y), (tr_x, tr_y), (cx, cy), (bl_x, bl_y), (br_x, br_y)]
-        elif valor == 6: pontos = [(tl_x, tl_y), (tr_x, tr_y), (ml_x, ml_y), (mr_x, mr_y), (bl_x, bl_y), (br_x, br_y)]
-            
-        for px, py in pontos:
-            pygame.draw.circle(self.tela, cor_ponto, (int(px), int(py)), raio)
+        self.sprites.desenhar_dado(self.tela, (x, y), valor, tamanho)
+
+    def _renderizar_camada_tabuleiro(self):
+        """Pré-renderiza caminho, casas e rótulos; só muda quando o layout é gerado de novo"""
+        area = self.rects_casas[0]['rect'].unionall([c['rect'] for c in self.rects_casas]).inflate(8, 8)
+        camada = pygame.Surface(area.size).convert()
+        camada.fill(self.C_FUNDO)
+        dx, dy = -area.x, -area.y
+
+        # Em tabuleiros grandes as casas encolhem: textos e bordas acompanham
+        lado = min(self.tamanho_casa)
+        raio_borda = min(8, lado // 4)
+        fonte_numero = self.fonte_pequena if lado >= 40 else self.fonte_mini
+        fonte_meta = self.fonte_grande if lado >= 70 else fonte_numero
+        mostrar_rotulos = lado >= 60
 
-    def _desenhar_tabuleiro(self):
         if len(self.rects_casas) > 1:
-            pontos = [c['center'] for c in self.rects_casas]
-            pygame.draw.lines(self.tela, (80, 80, 100), False, pontos, 8)
+            pontos = (self.centros_casas + (dx, dy)).tolist()
+            pygame.draw.lines(camada, (80, 80, 100), False, pontos, 8 if lado >= 40 else 3)
             
         for casa in self.rects_casas:
-            rect = casa['rect']
+            rect = casa['rect'].move(dx, dy)
             idx = casa['id']
             cor = self.C_CASA_PADRAO
             borda = self.C_BORDA
             largura_borda = 2
             
             shadow_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width, rect.height)
-            pygame.draw.rect(self.tela, (10, 10, 10), shadow_rect, border_radius=8)
+            pygame.draw.rect(camada, (10, 10, 10), shadow_rect, border_radius=raio_borda)
             
             if idx in self.casas_especiais:
                 tipo = self.casas_especiais[idx][0]
@@ -318,39 +275,48 @@ class CorridaEstatistica:
                 borda = (255, 255, 200)
                 largura_borda = 4
                 
-            pygame.draw.rect(self.tela, cor, rect, border_radius=8)
-            pygame.draw.rect(self.tela, borda, rect, largura_borda, border_radius=8)
+            pygame.draw.rect(camada, cor, rect, border_radius=raio_borda)
+            pygame.draw.rect(camada, borda, rect, min(largura_borda, max(1, lado // 10)), border_radius=raio_borda)
             
-            txt = self.fonte_pequena.render(str(idx + 1), True, (50, 50, 50))
-            self.tela.blit(txt, (rect.x + 5, rect.y + 5))
+            txt = self.cache_texto.render(fonte_numero, str(idx + 1), (50, 50, 50))
+            camada.blit(txt, (rect.x + 5, rect.y + 5) if lado >= 40 else (rect.x + 2, rect.y + 1))
             
-            if idx in self.casas_especiais:
+            if mostrar_rotulos and idx in self.casas_especiais:
                 label = self.casas_especiais[idx][2].split('!')[0]
-                txt_evt = self.fonte_mini.render(label, True, (0, 0, 0))
-                self.tela.blit(txt_evt, (rect.centerx - txt_evt.get_width()//2, rect.centery))
+                txt_evt = self.cache_texto.render(self.fonte_mini, label, (0, 0, 0))
+                camada.blit(txt_evt, (rect.centerx - txt_evt.get_width()//2, rect.centery))
                 
             if idx == self.meta - 1:
-                txt_meta = self.fonte_grande.render("META", True, (0,0,0))
-                self.tela.blit(txt_meta, (rect.centerx - txt_meta.get_width()//2, rect.centery - 10))
+                txt_meta = self.cache_texto.render(fonte_meta, "META", (0,0,0))
+                camada.blit(txt_meta, (rect.centerx - txt_meta.get_width()//2, rect.centery - 10))
+
+        self.camada_tabuleiro = (camada, area.topleft)
+
+    def _desenhar_tabuleiro(self):
+        if self.camada_tabuleiro is None:
+            self._renderizar_camada_tabuleiro()
+        camada, pos = self.camada_tabuleiro
+        self.tela.blit(camada, pos)
 
     def _desenhar_peoes(self):
-        for pid, dados in self.jogadores.items():
-            pos_idx = min(dados['pos'], len(self.rects_casas) - 1)
-            rect = self.rects_casas[pos_idx]['rect']
-            cx, cy = rect.center
-            cx += -12 if pid == 1 else 12
-            cy += 8
-            
-            pygame.draw.circle(self.tela, (0,0,0), (cx+2, cy+2), 14)
-            pygame.draw.circle(self.tela, dados['cor'], (cx, cy), 12)
-            pygame.draw.circle(self.tela, (255,255,255), (cx, cy), 12, 2)
-            
-            if pid == self.turno_atual and not self.vencedor and self.estado == "jogando":
-                pygame.draw.circle(self.tela, self.C_DESTAQUE, (cx, cy), 16, 3)
+        # Centros de todos os peões de uma vez: casa de cada jogador + vaga fixa do jogador
+        centros = self.centros_casas[np.minimum(self.posicoes, len(self.rects_casas) - 1)] + self.vagas_peoes
+        raio = self.raio_peao
+        destaque = self.turno_atual if not self.vencedor and self.estado == "jogando" else None
+        cores = [self.jogadores[pid]['cor'] for pid in self.ids_jogadores]
+        rects = []
+        for pid, (cx, cy) in zip(self.ids_jogadores, centros.tolist()):
+            rects.append(self.sprites.desenhar_peao(self.tela, (cx, cy), pid - 1, raio, cores, self.C_DESTAQUE,
+                                                    pid == destaque))
+        self.rects_peoes = rects
 
-    def _desenhar_botao(self, rect, texto, cor_normal, cor_hover, fonte):
-        mouse = pygame.mouse.get_pos()
-        cor = cor_hover if rect.collidepoint(mouse) else cor_normal
+    def _desenhar_botao(self, rect, texto, cor_normal, cor_hover, fonte, acao=None):
+        """Desenha o botão e registra sua ação; o clique é tratado em _tratar_evento"""
+        hover = rect.collidepoint(self.pos_mouse)
+        cor = cor_hover if hover else cor_normal
+        self.hover_botoes[tuple(rect)] = hover
+        if acao is not None:
+            self.botoes.append((rect, acao))
         
         shadow_rect = pygame.Rect(rect.x + 3, rect.y + 3, rect.width, rect.height)
         pygame.draw.rect(self.tela, (10, 10, 10), shadow_rect, border_radius=8)
@@ -358,17 +324,15 @@ class CorridaEstatistica:
         pygame.draw.rect(self.tela, cor, rect, border_radius=8)
         pygame.draw.rect(self.tela, (240, 240, 240), rect, 2, border_radius=8)
         
-        txt = fonte.render(texto, True, (255, 255, 255))
+        txt = self.cache_texto.render(fonte, texto, (255, 255, 255))
         self.tela.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
-        
-        return rect.collidepoint(mouse) and pygame.mouse.get_pressed()[0]
 
     def _desenhar_menu(self):
         self.tela.fill(self.C_FUNDO)
         
         # Título - CENTRALIZADO DINAMICAMENTE
-        titulo = self.fonte_grande.render("CORRIDA ESTATÍSTICA", True, self.C_DESTAQUE)
-        subtitulo = self.fonte_media.render("Análise de Probabilidade em Tempo Real", True, self.C_TEXTO)
+        titulo = self.cache_texto.render(self.fonte_grande, "CORRIDA ESTATÍSTICA", self.C_DESTAQUE)
+        subtitulo = self.cache_texto.render(self.fonte_media, "Análise de Probabilidade em Tempo Real", self.C_TEXTO)
         
         # Centralizar verticalmente
         titulo_y = self.altura_tela * 0.2
@@ -385,16 +349,13 @@ class CorridaEstatistica:
         
         # Botão Iniciar
         btn_iniciar = pygame.Rect(btn_x, btn_iniciar_y, btn_largura, btn_altura)
-        if self._desenhar_botao(btn_iniciar, "INICIAR JOGO", self.C_BOTAO, self.C_BOTAO_HOVER, self.fonte_media):
-            self.estado = "selecao_poder"
-            self.jogador_selecionando_poder = 1
-            pygame.time.delay(300)
+        self._desenhar_botao(btn_iniciar, "INICIAR JOGO", self.C_BOTAO, self.C_BOTAO_HOVER, self.fonte_media,
+                             acao=self._iniciar_selecao)
         
         # Botão Sair
         btn_sair = pygame.Rect(btn_x, btn_sair_y, btn_largura, btn_altura)
-        if self._desenhar_botao(btn_sair, "SAIR", (160, 60, 60), (180, 80, 80), self.fonte_media):
-            pygame.quit()
-            sys.exit()
+        self._desenhar_botao(btn_sair, "SAIR", (160, 60, 60), (180, 80, 80), self.fonte_media,
+                             acao=self._pedir_saida)
         
         # Instruções - CENTRALIZADAS DINAMICAMENTE
         instrucoes = [
@@ -408,7 +369,7 @@ class CorridaEstatistica:
         
         instrucoes_y = btn_sair_y + 100
         for i, texto in enumerate(instrucoes):
-            linha = self.fonte_pequena.render(texto, True, self.C_TEXTO)
+            linha = self.cache_texto.render(self.fonte_pequena, texto, self.C_TEXTO)
             self.tela.blit(linha, (self.largura_tela//2 - linha.get_width()//2, instrucoes_y + i * 30))
 
     def _desenhar_selecao_poder(self):
@@ -416,14 +377,14 @@ class CorridaEstatistica:
         
         # Título - CENTRALIZADO DINAMICAMENTE
         titulo_y = self.altura_tela * 0.08
-        titulo = self.fonte_grande.render(f"{self.jogadores[self.jogador_selecionando_poder]['nome']} - Escolha seu Poder", 
-                                         True, self.jogadores[self.jogador_selecionando_poder]['cor'])
+        titulo = self.cache_texto.render(self.fonte_grande, f"{self.jogadores[self.jogador_selecionando_poder]['nome']} - Escolha seu Poder", 
+                                         self.jogadores[self.jogador_selecionando_poder]['cor'])
         self.tela.blit(titulo, (self.largura_tela//2 - titulo.get_width()//2, titulo_y))
         
         # Instrução - CENTRALIZADA DINAMICAMENTE
         instrucao_y = titulo_y + 50
-        instrucao = self.fonte_media.render("Cada jogador pode usar seu poder UMA VEZ durante o jogo", 
-                                           True, self.C_DESTAQUE)
+        instrucao = self.cache_texto.render(self.fonte_media, "Cada jogador pode usar seu poder UMA VEZ durante o jogo", 
+                                           self.C_DESTAQUE)
         self.tela.blit(instrucao, (self.largura_tela//2 - instrucao.get_width()//2, instrucao_y))
         
         # Desenhar opções de poderes - CENTRALIZADAS DINAMICAMENTE
@@ -452,21 +413,20 @@ class CorridaEstatistica:
             pygame.draw.rect(self.tela, (240, 240, 240), rect, 2, border_radius=12)
             
             # Nome do poder
-            nome_texto = self.fonte_media.render(poder['nome'], True, (255, 255, 255))
+            nome_texto = self.cache_texto.render(self.fonte_media, poder['nome'], (255, 255, 255))
             self.tela.blit(nome_texto, (rect.centerx - nome_texto.get_width()//2, y + 15))
             
             # Descrição
-            desc_texto = self.fonte_pequena.render(poder['descricao'], True, (240, 240, 240))
+            desc_texto = self.cache_texto.render(self.fonte_pequena, poder['descricao'], (240, 240, 240))
             self.tela.blit(desc_texto, (rect.centerx - desc_texto.get_width()//2, y + 55))
             
-            # Verificar clique
-            mouse_pos = pygame.mouse.get_pos()
-            if rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
-                self.selecionar_poder(self.jogador_selecionando_poder, i)
-                pygame.time.delay(300)
+            # Clique tratado em _tratar_evento
+            self.botoes.append((rect, lambda i=i: self._escolher_poder_pelo_jogador(i)))
 
-    def _desenhar_painel_esquerdo(self):
+    def _renderizar_camada_painel(self):
+        """Pré-renderiza o degradê de fundo do painel para a altura atual da tela"""
         w_painel = 380
+        self.camada_painel = pygame.Surface((w_painel, self.altura_tela)).convert()
         for i in range(w_painel):
             alpha = i / w_painel
             cor = (
@@ -474,35 +434,40 @@ class CorridaEstatistica:
                 int(self.C_PAINEL[1] * (1 - alpha) + self.C_FUNDO[1] * alpha),
                 int(self.C_PAINEL[2] * (1 - alpha) + self.C_FUNDO[2] * alpha)
             )
-            pygame.draw.line(self.tela, cor, (i, 0), (i, self.altura_tela))
+            pygame.draw.line(self.camada_painel, cor, (i, 0), (i, self.altura_tela))
+
+    def _desenhar_painel_esquerdo(self):
+        if self.camada_painel is None:
+            self._renderizar_camada_painel()
+        self.tela.blit(self.camada_painel, (0, 0))
         
         y_cursor = 15
         
-        titulo = self.fonte_grande.render("ANÁLISE ESTATÍSTICA", True, self.C_DESTAQUE)
+        titulo = self.cache_texto.render(self.fonte_grande, "ANÁLISE ESTATÍSTICA", self.C_DESTAQUE)
         self.tela.blit(titulo, (20, y_cursor))
         y_cursor += 50
         
         btn_jogar = pygame.Rect(20, y_cursor, 160, 45)
-        if self._desenhar_botao(btn_jogar, "JOGAR (Espaço)", 
-                               self.C_BOTAO, self.C_BOTAO_HOVER, self.fonte_media):
-            if not self.vencedor and self.estado == "jogando":
-                pygame.time.wait(150)
-                self.jogar_dados()
+        self._desenhar_botao(btn_jogar, "JOGAR (Espaço)", 
+                             self.C_BOTAO, self.C_BOTAO_HOVER, self.fonte_media, acao=self._jogar_pelo_jogador)
 
         btn_reset = pygame.Rect(190, y_cursor, 160, 45)
-        if self._desenhar_botao(btn_reset, "RESET (R)", 
-                               (160, 60, 60), (180, 80, 80), self.fonte_media):
-            self.reiniciar()
+        self._desenhar_botao(btn_reset, "RESET (R)", 
+                             (160, 60, 60), (180, 80, 80), self.fonte_media, acao=self.reiniciar)
 
         y_cursor += 60
         
-        if self.estado == "jogando" and not self.vencedor:
+        if self.turbo:
+            txt_turbo = self.cache_texto.render(self.fonte_media, f"TURBO: {ROLAGENS_TURBO_POR_SEGUNDO:,} lanç./s (T)",
+                                                self.C_DESTAQUE)
+            self.tela.blit(txt_turbo, (20, y_cursor))
+        elif self.estado == "jogando" and not self.vencedor:
             nome = self.jogadores[self.turno_atual]['nome']
             cor = self.jogadores[self.turno_atual]['cor']
-            txt_vez = self.fonte_media.render(f"Vez de: {nome}", True, cor)
+            txt_vez = self.cache_texto.render(self.fonte_media, f"Vez de: {nome}", cor)
             self.tela.blit(txt_vez, (20, y_cursor))
         elif self.estado == "fim":
-            txt_venc = self.fonte_grande.render("JOGO ENCERRADO", True, self.C_DESTAQUE)
+            txt_venc = self.cache_texto.render(self.fonte_grande, "JOGO ENCERRADO", self.C_DESTAQUE)
             self.tela.blit(txt_venc, (20, y_cursor))
 
         y_cursor += 40
@@ -512,19 +477,18 @@ class CorridaEstatistica:
             tamanho_dado = 50
             self._desenhar_dado_pontos(20, y_cursor, tamanho_dado, d1)
             self._desenhar_dado_pontos(80, y_cursor, tamanho_dado, d2)
-            txt_soma = self.fonte_grande.render(f"= {soma}", True, (255,255,255))
+            txt_soma = self.cache_texto.render(self.fonte_grande, f"= {soma}", (255,255,255))
             self.tela.blit(txt_soma, (140, y_cursor + 10))
-            self.timer_dados_visiveis -= 1
 
         y_cursor += 60
         
         if self.estado == "jogando" and not self.vencedor:
-            jogador = self.jogadores[self.turno_atual]
-            if jogador['poder'] and not jogador['poder_usado']:
+            poder = self.poder_de(self.turno_atual)
+            if poder and not self.poder_usado[self.turno_atual - 1]:
                 btn_poder = pygame.Rect(20, y_cursor, 330, 40)
-                if self._desenhar_botao(btn_poder, f"USAR PODER: {jogador['poder']['nome']}", 
-                                       self.C_PODER, (200, 120, 240), self.fonte_pequena):
-                    self.usar_poder(self.turno_atual)
+                self._desenhar_botao(btn_poder, f"USAR PODER: {poder['nome']}", 
+                                     self.C_PODER, (200, 120, 240), self.fonte_pequena,
+                                     acao=self._usar_poder_pelo_jogador)
                 y_cursor += 50
 
         y_cursor += 20
@@ -534,26 +498,39 @@ class CorridaEstatistica:
         col_x = [20, 100, 180, 260]
         titulos = ["", "Média", "Mediana", "Moda"]
         for i, t in enumerate(titulos):
-            surf = self.fonte_pequena.render(t, True, (180,180,180))
+            surf = self.cache_texto.render(self.fonte_pequena, t, (180,180,180))
             self.tela.blit(surf, (col_x[i], y_cursor))
         
         y_cursor += 25
-        for pid in [1, 2]:
-            media, mediana, moda = self._calcular_stats_texto(pid)
+        # Com mais de dois jogadores as linhas ficam compactas e o poder vira só o símbolo de estado
+        compacto = self.n_jogadores > 2
+        for pid in self.ids_jogadores:
+            textos = self._calcular_stats_texto(pid)
             cor = self.jogadores[pid]['cor']
-            t_nome = self.fonte_pequena.render(f"Jog {pid}", True, cor)
+            t_nome = self.cache_texto.render(self.fonte_pequena, f"Jog {pid}", cor)
             self.tela.blit(t_nome, (col_x[0], y_cursor))
-            for i, val in enumerate([media, mediana, moda]):
-                t_val = self.fonte_pequena.render(val, True, (255,255,255))
+            for i, val in enumerate(textos):
+                t_val = self.cache_texto.render(self.fonte_pequena, val, (255,255,255))
                 self.tela.blit(t_val, (col_x[i+1], y_cursor))
             
-            if self.jogadores[pid]['poder']:
-                status = "✓" if self.jogadores[pid]['poder_usado'] else "●"
-                cor_status = (150,150,150) if self.jogadores[pid]['poder_usado'] else self.jogadores[pid]['poder']['cor']
-                txt_poder = self.fonte_mini.render(f"{status} {self.jogadores[pid]['poder']['nome']}", True, cor_status)
-                self.tela.blit(txt_poder, (20, y_cursor + 15))
+            poder = self.poder_de(pid)
+            if poder:
+                usado = self.poder_usado[pid - 1]
+                status = "✓" if usado else "●"
+                cor_status = (150,150,150) if usado else poder['cor']
+                if compacto:
+                    txt_poder = self.cache_texto.render(self.fonte_mini, status, cor_status)
+                    self.tela.blit(txt_poder, (330, y_cursor + 2))
+                else:
+                    txt_poder = self.cache_texto.render(self.fonte_mini, f"{status} {poder['nome']}", cor_status)
+                    self.tela.blit(txt_poder, (20, y_cursor + 15))
             
-            y_cursor += 35
+            y_cursor += 22 if compacto else 35
+
+        if self.estado == "jogando" and not self.vencedor and self._texto_chances():
+            txt_chances = self.cache_texto.render(self.fonte_mini, self._texto_chances(), (200, 200, 200))
+            self.tela.blit(txt_chances, (20, y_cursor))
+            y_cursor += 20
 
         y_cursor += 10
         
@@ -563,173 +540,616 @@ class CorridaEstatistica:
             pygame.draw.rect(self.tela, (255, 255, 100), r_msg, 1, border_radius=5)
             
             if len(self.msg_evento) > 25:
-                t_msg = self.fonte_pequena.render(self.msg_evento, True, (255, 255, 100))
+                t_msg = self.cache_texto.render(self.fonte_pequena, self.msg_evento, (255, 255, 100))
             else:
-                t_msg = self.fonte_media.render(self.msg_evento, True, (255, 255, 100))
+                t_msg = self.cache_texto.render(self.fonte_media, self.msg_evento, (255, 255, 100))
                 
             text_rect = t_msg.get_rect(center=r_msg.center)
             self.tela.blit(t_msg, text_rect)
             
-            self.timer_evento -= 1
             y_cursor += 50
 
         y_grafico = y_cursor + 20
         altura_disp = self.altura_tela - y_grafico - 10
-        if self.dados_para_grafico_atualizados or self.img_grafico_cache is None:
-            self._gerar_grafico_matplotlib(3.8, altura_disp / 80)
+        if altura_disp <= 0:
+            # Sem espaço para o gráfico (janela baixa ou muitos jogadores): nada é gerado nem desenhado,
+            # e altura 0 faz _receber_grafico descartar o que a thread ainda entregar
+            self.img_grafico_cache = None
+            self.rect_grafico = None
+            self.altura_grafico = 0
+            return
+        aguardando = self.grafico_em_segundo_plano is not None and self.grafico_em_segundo_plano.ocupado
+        if self.dados_para_grafico_atualizados or (self.img_grafico_cache is None and not aguardando):
+            self.altura_grafico = int(altura_disp / 80 * 100)
+            self._gerar_grafico(3.8, altura_disp / 80)
             self.dados_para_grafico_atualizados = False
         if self.img_grafico_cache:
             self.tela.blit(self.img_grafico_cache, (10, y_grafico))
+            self.rect_grafico = self.img_grafico_cache.get_rect(topleft=(10, y_grafico))
+
+    def _texto_chances(self):
+        """Chance exata de vitória de cada jogador, supondo que nenhum poder restante seja usado
+
+        Só existe para dois jogadores (texto vazio nos outros casos). Enquanto a cadeia do
+        tabuleiro é resolvida em segundo plano mostra "…".
+        """
+        chave = (self.turno_atual, self.posicoes.tobytes(),
+                 self.poder_dobrar_ativa, self.turno_extra)
+        if chave != self.chave_chances:
+            if not modelavel(self):
+                self.texto_chances = ""
+            else:
+                solucao = self.cadeias.obter(self.meta, self.casas_especiais)
+                if solucao is None:
+                    # EVENTO_CHANCES_PRONTAS redesenha a tela quando a solução chegar
+                    return "Chance de vitória: …"
+                probs, turnos = chances_partida(self, solucao)
+                self.texto_chances = (f"Chance de vitória: J1 {probs[1]:.1%} · J2 {probs[2]:.1%}"
+                                      f" · ~{turnos:.1f} lançamentos")
+            self.chave_chances = chave
+        return self.texto_chances
+
+    def _series_grafico(self):
+        """Dados de cada jogador usados pelos gráficos"""
+        series = []
+        prazo_banda = time.perf_counter() + ORCAMENTO_BANDA_MS / 1000
+        for pid in self.ids_jogadores:
+            medias_x, medias_y = self.historico_medias[pid].pontos()
+            serie = {'pid': pid, 'cor': self.jogadores[pid]['cor'],
+                     'contagens': self.estatisticas[pid].contagens, 'n': self.estatisticas[pid].n,
+                     'dobrados': int(self.lancamentos_dobrados[pid - 1]),
+                     'medias_x': medias_x, 'medias_y': medias_y}
+            if self.mostrar_banda:
+                self.bandas[pid].atualizar(self.estatisticas[pid], prazo_banda)
+                serie['banda_x'], serie['banda_inferior'], serie['banda_superior'] = self.bandas[pid].pontos()
+            series.append(serie)
+        return series
+
+    def _renderizador(self, modo):
+        if modo not in self.graficos:
+            self.graficos[modo] = MODOS_GRAFICO[modo]()
+        return self.graficos[modo]
+
+    def _gerar_grafico(self, w_inch, h_inch):
+        """Gera os gráficos com o renderizador do modo atual"""
+        inicio = self.perfil.marcar()
+        if self.modo_grafico == "pygame":
+            self._gerar_grafico_pygame(w_inch, h_inch)
+        else:
+            self._gerar_grafico_matplotlib(w_inch, h_inch)
+        self.perfil.acumular("grafico", inicio)
 
     def _gerar_grafico_matplotlib(self, w_inch, h_inch):
         """Gera gráficos estatísticos precisos em tempo real com eixo X dinâmico"""
-        todos_dados = []
-        for pid in [1, 2]:
-            todos_dados.extend(self.jogadores[pid]['dados'])
-        
-        if len(todos_dados) < 1:
+        if not any(e.n for e in self.estatisticas.values()):
             return
-            
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(w_inch + 1, h_inch))
-        fig.patch.set_facecolor('#141923')
-        
-        # Gráfico 1: Distribuição de frequência CORRETA com eixo X dinâmico
-        if todos_dados:
-            # Determinar o intervalo dinâmico do eixo X
-            min_valor = min(todos_dados)
-            max_valor = max(todos_dados)
-            
-            # Garantir que o mínimo seja pelo menos 2 e o máximo pelo menos 12
-            min_valor = min(2, min_valor)
-            max_valor = max(12, max_valor)
-            
-            # Expandir um pouco o intervalo para melhor visualização
-            min_valor = max(2, min_valor - 1)
-            max_valor = max_valor + 1
-            
-            valores_possiveis = list(range(min_valor, max_valor))
-            
-            # Plot para cada jogador
-            for pid in [1, 2]:
-                dados_jogador = self.jogadores[pid]['dados']
-                if len(dados_jogador) > 0:
-                    freq_jogador = []
-                    for valor in valores_possiveis:
-                        freq = dados_jogador.count(valor) / len(dados_jogador)
-                        freq_jogador.append(freq)
-                    
-                    cor = np.array(self.jogadores[pid]['cor']) / 255
-                    # Ajustar a posição das barras para dois jogadores
-                    offset = (pid - 1.5) * 0.4
-                    valores_plot = [v + offset for v in valores_possiveis]
-                    ax1.bar(valores_plot, freq_jogador, 
-                           width=0.35, color=cor, alpha=0.7, label=f"J{pid}")
-
-            # Distribuição teórica CORRETA para dois dados (apenas para 2-12)
-            prob_teo = []
-            for valor in valores_possiveis:
-                if 2 <= valor <= 12:
-                    # Cálculo da probabilidade teórica para dois dados
-                    if valor <= 7:
-                        prob = (valor - 1) / 36
-                    else:
-                        prob = (13 - valor) / 36
-                else:
-                    prob = 0
-                prob_teo.append(prob)
-            
-            # Plot da distribuição teórica
-            ax1.plot(valores_possiveis, prob_teo, 'w-', linewidth=2, alpha=0.8, label="Teórico")
-            ax1.fill_between(valores_possiveis, prob_teo, alpha=0.2, color='white')
-            
-            ax1.set_title("Distribuição de Probabilidade", color='white', fontsize=10, pad=10)
-            ax1.set_xlabel('Soma dos Dados', color='white', fontsize=9)
-            ax1.set_ylabel('Frequência Relativa', color='white', fontsize=9)
-            ax1.legend(fontsize=7, facecolor='#232337', loc='upper right')
-            
-            # Configurar ticks do eixo X
-            if max_valor - min_valor <= 20:  # Mostrar todos os valores se não for muito grande
-                ax1.set_xticks(valores_possiveis)
-            else:  # Caso contrário, mostrar a cada 2 valores
-                ax1.set_xticks([x for x in valores_possiveis if x % 2 == 0])
-            
-            ax1.grid(True, alpha=0.3, color='gray')
-            ax1.tick_params(colors='white', labelsize=8)
-            ax1.set_facecolor('#232337')
-
-        # Gráfico 2: Convergência da média CORRETA
-        ax2.clear()
-        for pid in [1, 2]:
-            medias = self.historico_medias[pid]
-            if len(medias) > 0:
-                cor = np.array(self.jogadores[pid]['cor']) / 255
-                ax2.plot(range(1, len(medias)+1), medias, 
-                        color=cor, linewidth=2, label=f"J{pid}")
-        
-        # Linha da média teórica
-        ax2.axhline(7, color='white', linestyle='--', linewidth=2, alpha=0.7, 
-                   label="Média Teórica = 7.0")
-        
-        ax2.set_title("Lei dos Grandes Números", color='white', fontsize=10, pad=10)
-        ax2.set_xlabel('Número de Lançamentos', color='white', fontsize=9)
-        ax2.set_ylabel('Média Acumulada', color='white', fontsize=9)
-        ax2.legend(fontsize=7, facecolor='#232337')
-        ax2.grid(True, alpha=0.3, color='gray')
-        
-        ax2.tick_params(colors='white', labelsize=8)
-        ax2.set_facecolor('#232337')
-
-        # Estilização consistente
-        for ax in [ax1, ax2]:
-            for spine in ax.spines.values():
-                spine.set_color('white')
-            
-        plt.tight_layout(pad=2.0)
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', facecolor='#141923', dpi=100, 
-                   bbox_inches='tight', pad_inches=0.1)
-        buf.seek(0)
-        plt.close(fig)
+        if self.grafico_assincrono:
+            if self.grafico_em_segundo_plano is None:
+                self.grafico_em_segundo_plano = GraficoEmSegundoPlano(
+                    ao_concluir=lambda: pygame.event.post(pygame.event.Event(EVENTO_GRAFICO_PRONTO)))
+            self.grafico_em_segundo_plano.pedir(self._series_grafico(), w_inch, h_inch)
+            return
+        self.img_grafico_cache = self._renderizador("matplotlib").renderizar(self._series_grafico(), w_inch, h_inch)
+
+    def _receber_grafico(self):
+        """Troca a imagem exibida pela última que a thread dos gráficos terminou"""
+        if self.grafico_em_segundo_plano is None:
+            return
+        imagem = self.grafico_em_segundo_plano.resultado()
+        # Um resultado que chega depois de trocar para o modo pygame, de reiniciar ou de mudar o tamanho é descartado
+        if imagem is None or self.modo_grafico != "matplotlib" or not any(e.n for e in self.estatisticas.values()):
+            return
+        if abs(imagem.get_height() - self.altura_grafico) > 1:
+            return
+        if self.rect_grafico:
+            self.regioes_sujas.append(self.rect_grafico)
+        self.img_grafico_cache = imagem
+        if self.rect_grafico:
+            self.rect_grafico = imagem.get_rect(topleft=self.rect_grafico.topleft)
+            self.regioes_sujas.append(self.rect_grafico)
+        else:
+            self.tela_inteira_suja = True
+
+    def _gerar_grafico_pygame(self, w_inch, h_inch):
+        """Mesmos gráficos desenhados direto com pygame (sem matplotlib)"""
+        if not any(e.n for e in self.estatisticas.values()):
+            return
+        self.img_grafico_cache = self._renderizador("pygame").renderizar(self._series_grafico(), w_inch, h_inch)
+
+    def alternar_modo_grafico(self):
+        self.modo_grafico = "pygame" if self.modo_grafico == "matplotlib" else "matplotlib"
+        self.dados_para_grafico_atualizados = True
+
+    def alternar_banda(self):
+        """Mostra/esconde a faixa; ao mostrar, acrescenta o ponto do n atual, que ficou para trás
+        enquanto ela estava escondida (os marcos anteriores não são refeitos)"""
+        self.mostrar_banda = not self.mostrar_banda
+        if self.mostrar_banda:
+            prazo_banda = time.perf_counter() + ORCAMENTO_BANDA_MS / 1000
+            for pid in self.ids_jogadores:
+                self.bandas[pid].atualizar(self.estatisticas[pid], prazo_banda)
+        self.dados_para_grafico_atualizados = True
+
+    def exportar_grafico(self):
+        """Exporta os gráficos em PNG de alta qualidade via matplotlib"""
+        if not any(e.n for e in self.estatisticas.values()):
+            return None
+        caminho = time.strftime("grafico_%Y%m%d_%H%M%S.png")
+        GraficoMatplotlib.exportar(self._series_grafico(), caminho)
+        self.msg_evento = f"Gráfico salvo: {caminho}"
+        self.timer_evento = 120
+        return caminho
+
+    def _chave_grafico(self):
+        """Identifica os dados desenhados no gráfico (a imagem guardada de outro tamanho vale se a chave for igual)"""
+        return (self.modo_grafico, self.mostrar_banda, tuple(e.versao for e in self.estatisticas.values()))
+
+    def _pedir_redimensionamento(self, tamanho):
+        """Chamado a cada VIDEORESIZE: só anota o tamanho; o layout é refeito quando ele parar de mudar"""
+        tamanho = tuple(tamanho)
+        if self.tamanho_pendente is None:
+            if tamanho == (self.largura_tela, self.altura_tela):
+                return
+            self.quadro_base_previa = self._capturar_quadro()
+            # Os botões do último quadro não estão mais onde a prévia os mostra
+            self.botoes = []
+            self.hover_botoes = {}
+        self.tamanho_pendente = tamanho
+        self.redimensionado_em = pygame.time.get_ticks()
+
+    def _capturar_quadro(self):
+        """Compõe o quadro atual fora da tela, no tamanho antigo (base das prévias escaladas)"""
+        tela = self.tela
+        self.tela = pygame.Surface((self.largura_tela, self.altura_tela))
+        try:
+            self._compor_quadro()
+            return self.tela
+        finally:
+            self.tela = tela
+
+    def _desenhar_previa(self):
+        """Último quadro completo escalado para o tamanho atual da janela (transform.scale, sem suavizar)"""
+        if self.previa is not None and self.previa.get_size() == self.tamanho_pendente:
+            return
+        self.previa = pygame.transform.scale(self.quadro_base_previa, self.tamanho_pendente)
+        tela = pygame.display.get_surface()
+        tela.fill(self.C_FUNDO)
+        tela.blit(self.previa, (0, 0))
+        pygame.display.flip()
+
+    def _avancar_redimensionamento(self):
+        if self.tamanho_pendente is None:
+            return
+        if pygame.time.get_ticks() - self.redimensionado_em < INTERVALO_REDIMENSIONAR_MS:
+            return
+        tamanho, self.tamanho_pendente = self.tamanho_pendente, None
+        self.quadro_base_previa = self.previa = None
+        self._aplicar_tamanho(tamanho)
+
+    def _aplicar_tamanho(self, tamanho):
+        """Muda para `tamanho`, reaproveitando layout, camadas e gráfico guardados para ele"""
+        atual = (self.largura_tela, self.altura_tela)
+        if tamanho != atual:
+            layout = {nome: getattr(self, nome) for nome in CAMPOS_LAYOUT}
+            layout['grafico'] = (self._chave_grafico(), self.img_grafico_cache) if self.img_grafico_cache else None
+            self.layouts.guardar(atual, layout)
+        self.largura_tela, self.altura_tela = tamanho
+        self.tela = pygame.display.set_mode(tamanho, pygame.RESIZABLE)
+        self.tela_inteira_suja = True
+        if tamanho == atual:
+            return
+
+        guardado = self.layouts.obter(tamanho)
+        if guardado is None:
+            self._gerar_layout_tabuleiro()
+            self.dados_para_grafico_atualizados = True
+            return
+        for nome in CAMPOS_LAYOUT:
+            setattr(self, nome, guardado[nome])
+        grafico = guardado['grafico']
+        if grafico is not None and grafico[0] == self._chave_grafico():
+            self.img_grafico_cache = grafico[1]
+            self.altura_grafico = self.img_grafico_cache.get_height()
+            self.dados_para_grafico_atualizados = False
+        else:
+            self.dados_para_grafico_atualizados = True
+
+    def _assinatura_estado(self):
+        """Resumo barato de tudo que muda o conteúdo da tela fora do hover dos botões"""
+        return (self.estado, self.turno_atual, self.vencedor, self.jogador_selecionando_poder,
+                self.posicoes.tobytes(), self.poder_usado.tobytes(), self.poder_jogadores.tobytes(),
+                self.msg_evento, self.timer_evento > 0, self.timer_dados_visiveis > 0,
+                tuple(e.versao for e in self.estatisticas.values()), self.modo_grafico, self.mostrar_banda, self.turbo)
+
+    def _verificar_hover(self, pos):
+        """Marca como sujos só os botões que entraram ou saíram do hover"""
+        for chave, hover in self.hover_botoes.items():
+            rect = pygame.Rect(chave)
+            if rect.collidepoint(pos) != hover:
+                self.regioes_sujas.append(rect.inflate(8, 8))
+
+    def _avancar_timers(self):
+        # Em todos os estados: um timer parado acima de zero impediria o laço de dormir
+        if self.timer_dados_visiveis > 0:
+            self.timer_dados_visiveis -= 1
+        if self.timer_evento > 0:
+            self.timer_evento -= 1
+
+    def _avancar_reproducao(self, dt_ms):
+        """Aplica os eventos do registro em reprodução no ritmo escolhido"""
+        if self.reproducao is None:
+            return
+        restantes = len(self.reproducao) - self.indice_reproducao
+        if self.velocidade_reproducao <= 0:
+            n = restantes
+        else:
+            self.credito_reproducao += dt_ms / 1000 * self.velocidade_reproducao
+            n = min(restantes, int(self.credito_reproducao))
+            self.credito_reproducao -= n
+        for _ in range(n):
+            self.aplicar_evento(*self.reproducao[self.indice_reproducao])
+            self.indice_reproducao += 1
+        if self.indice_reproducao >= len(self.reproducao):
+            self.reproducao = None
+            self.msg_evento = "Reprodução concluída"
+            self.timer_evento = 120
+
+    def alternar_turbo(self):
+        if self.estado != "jogando" or self.reproducao is not None:
+            return
+        self.turbo = not self.turbo
+        self.credito_turbo_ms = 0.0
+
+    def _avancar_turbo(self, dt_ms):
+        """Acumula o tempo e, a cada INTERVALO_TURBO_MS, lança o lote correspondente de uma vez"""
+        if not self.turbo:
+            return
+        self.credito_turbo_ms += dt_ms
+        if self.credito_turbo_ms < INTERVALO_TURBO_MS:
+            return
+        # Depois de um travamento longo (ou da espera ociosa) não compensa o atraso de uma vez
+        n = int(min(self.credito_turbo_ms, 4 * INTERVALO_TURBO_MS) * ROLAGENS_TURBO_POR_SEGUNDO / 1000)
+        self.credito_turbo_ms = 0.0
+        self.rolar_lote(n)
+
+    def salvar_registro(self, caminho=None):
+        caminho = caminho or time.strftime("sessao_%Y%m%d_%H%M%S.cest")
+        self.registro.salvar(caminho)
+        self.msg_evento = f"Registro salvo: {caminho}"
+        self.timer_evento = 120
+        return caminho
+
+    def alternar_gravacao(self, pasta=None):
+        """Começa ou para de gravar a tela; a gravação parada termina de ser escrita em segundo plano"""
+        if self.gravador is not None:
+            gravador, self.gravador = self.gravador, None
+            gravador.encerrar(esperar=False)
+            self.msg_evento = (f"Gravação salva: {gravador.pasta} ({gravador.capturados} quadros, "
+                               f"{gravador.descartados} descartados)")
+        else:
+            pasta = pasta or time.strftime("gravacao_%Y%m%d_%H%M%S")
+            self.gravador = GravadorSessao(pasta, self.formato_gravacao)
+            self.gravacoes.append(self.gravador)
+            self.msg_evento = f"Gravando em {pasta} (F9 para parar)"
+        self.timer_evento = 120
+        return self.gravador
+
+    def _ocioso(self):
+        """Sem animação pendente nem nada para redesenhar: o laço pode dormir até o próximo evento"""
+        return (self.gravador is None and self.reproducao is None and not self.turbo and self._vez_da_ia() is None and self.tamanho_pendente is None
+                and self.timer_evento == 0 and self.timer_dados_visiveis == 0 and not self.tela_inteira_suja
+                and not self.regioes_sujas and self.assinatura_anterior == self._assinatura_estado())
+
+    def _iniciar_selecao(self):
+        self.estado = "selecao_poder"
+        self.jogador_selecionando_poder = 1
+
+    def _pedir_saida(self):
+        self.pedido_saida = True
+
+    def _jogar_pelo_jogador(self):
+        """Lançamento pedido pelo botão ou pelo Espaço (ignorado durante uma reprodução e na vez do computador)"""
+        if not self.vencedor and self.estado == "jogando" and self.reproducao is None and self._vez_da_ia() is None:
+            self.jogar_dados()
+
+    def _usar_poder_pelo_jogador(self):
+        if self._vez_da_ia() is None:
+            self.usar_poder(self.turno_atual)
+
+    def _escolher_poder_pelo_jogador(self, indice):
+        if self._vez_da_ia() is None:
+            self.selecionar_poder(self.jogador_selecionando_poder, indice)
+
+    def _vez_da_ia(self):
+        """JogadorIA que deve agir agora, ou None"""
+        if not self.ia or self.reproducao is not None:
+            return None
+        if self.estado == "selecao_poder":
+            return self.ia.get(self.jogador_selecionando_poder)
+        if self.estado == "jogando" and not self.vencedor and not self.turbo:
+            return self.ia.get(self.turno_atual)
+        return None
+
+    def _avancar_ia(self, dt_ms):
+        """Na vez do computador, age a cada ATRASO_IA_MS: escolhe o poder, decide se o usa e lança"""
+        ia = self._vez_da_ia()
+        if ia is None:
+            self.credito_ia_ms = 0.0
+            return
+        self.credito_ia_ms += dt_ms
+        if self.credito_ia_ms < ATRASO_IA_MS:
+            return
+        self.credito_ia_ms = 0.0
+        pid = ia.jogador_id
+        if self.estado == "selecao_poder":
+            self.selecionar_poder(pid, ia.escolher_poder(self))
+        elif ia.decidir(self):
+            # Usa o poder agora e lança na próxima ação, para a mensagem do poder aparecer
+            self.usar_poder(pid)
+        else:
+            self.jogar_dados()
+
+    def _clicar(self, pos):
+        """Testa o clique contra os botões do último quadro e executa a ação do que estiver por cima"""
+        agora = pygame.time.get_ticks()
+        if agora - self.ultimo_clique_ms < INTERVALO_CLIQUE_MS:
+            return
+        # Se o estado mudou desde o último quadro, os botões na tela não são mais os registrados
+        if self.estado_botoes != self.estado:
+            return
+        for rect, acao in reversed(self.botoes):
+            if rect.collidepoint(pos):
+                self.ultimo_clique_ms = agora
+                acao()
+                return
+
+    def _compor_quadro(self):
+        self.tela.fill(self.C_FUNDO)
+        # Botões e hover valem só para a tela que está sendo composta
+        self.botoes = []
+        self.hover_botoes = {}
+        self.estado_botoes = self.estado
         
-        self.img_grafico_cache = pygame.image.load(buf)
-        buf.close()
+        if self.estado == "menu":
+            self._desenhar_menu()
+        elif self.estado == "selecao_poder":
+            self._desenhar_selecao_poder()
+        else:
+            perfil = self.perfil
+            inicio = perfil.marcar()
+            self._desenhar_painel_esquerdo()
+            perfil.acumular("painel", inicio)
+            inicio = perfil.marcar()
+            self._desenhar_tabuleiro()
+            perfil.acumular("tabuleiro", inicio)
+            inicio = perfil.marcar()
+            self._desenhar_peoes()
+            perfil.acumular("peoes", inicio)
+        if self.perfil.ativo:
+            self._desenhar_perfil()
+
+    def _rect_perfil(self):
+        return pygame.Rect(self.largura_tela - 330, 10, 320, 64 + 26 * len(ETAPAS))
+
+    def _desenhar_perfil(self):
+        """Sobreposição com FPS, tempo de quadro e histograma de cada etapa nos últimos quadros"""
+        rect = self._rect_perfil()
+        fundo = pygame.Surface(rect.size, pygame.SRCALPHA)
+        fundo.fill((0, 0, 0, 190))
+        self.tela.blit(fundo, rect.topleft)
+        pygame.draw.rect(self.tela, (120, 120, 140), rect, 1)
+
+        # Números mudam a cada quadro: renderiza direto para não esvaziar o cache de textos
+        fonte = self.fonte_mini
+        resumo = self.perfil.resumo()
+        if resumo is None:
+            self.tela.blit(fonte.render("Perfil: aguardando quadros...", True, self.C_TEXTO), (rect.x + 8, rect.y + 8))
+            return
+        media, p95 = resumo['media'], resumo['p95']
+        cabecalho = f"{resumo['fps']:.1f} fps · quadro {media['quadro']:.2f} ms (p95 {p95['quadro']:.2f})"
+        self.tela.blit(fonte.render(cabecalho, True, self.C_DESTAQUE), (rect.x + 8, rect.y + 6))
+
+        y = rect.y + 28
+        for etapa in ETAPAS:
+            texto = f"{etapa:<9} {media[etapa]:6.2f} ms  p95 {p95[etapa]:6.2f}"
+            self.tela.blit(fonte.render(texto, True, self.C_TEXTO), (rect.x + 8, y))
+            contagens, limite = self.perfil.histograma(etapa)
+            base = pygame.Rect(rect.right - 88, y, 80, 20)
+            pygame.draw.rect(self.tela, (40, 40, 55), base)
+            maior = max(int(contagens.max()), 1)
+            largura_barra = base.width // len(contagens)
+            for i, c in enumerate(contagens):
+                if c:
+                    h = max(1, int(base.height * c / maior))
+                    pygame.draw.rect(self.tela, self.C_BOTAO_HOVER,
+                                     (base.x + i * largura_barra, base.bottom - h, largura_barra - 1, h))
+            self.tela.blit(fonte.render(f"{limite:.0f}", True, (150, 150, 150)), (base.x - 22, y + 4))
+            y += 26
+
+        cache = self.cache_texto
+        rodape = f"textos: {cache.taxa_acertos:.0%} acertos, {len(cache)} em cache · F4 exporta CSV"
+        self.tela.blit(fonte.render(rodape, True, (170, 170, 170)), (rect.x + 8, y + 4))
+
+    def alternar_perfil(self):
+        self.perfil.alternar()
+        self.tela_inteira_suja = True
+
+    def exportar_perfil(self):
+        if self.perfil.total_quadros == 0:
+            return None
+        caminho = self.perfil.exportar_csv()
+        self.msg_evento = f"Perfil salvo: {caminho}"
+        self.timer_evento = 120
+        return caminho
+
+    def _desenhar_quadro(self):
+        """Compõe o quadro e envia para a tela só o que mudou (ou tudo, no modo completo)"""
+        if self.tamanho_pendente is not None:
+            self._desenhar_previa()
+            return
+        if self.modo_redesenho == "completo":
+            self._compor_quadro()
+            pygame.display.flip()
+            return
+
+        assinatura = self._assinatura_estado()
+        anterior = self.assinatura_anterior
+        if assinatura != anterior:
+            if anterior is None or anterior[0] != assinatura[0] or self.estado not in ("jogando", "fim"):
+                self.tela_inteira_suja = True
+            else:
+                # Dados, mensagem, estatísticas e gráfico ficam no painel; no tabuleiro só os peões mudam
+                largura_painel = max(380, self.rect_grafico.right if self.rect_grafico else 0)
+                self.regioes_sujas.append(pygame.Rect(0, 0, largura_painel, self.altura_tela))
+                self.regioes_sujas.extend(self.rects_peoes)
+        if not self.tela_inteira_suja and not self.regioes_sujas:
+            return
+
+        self._compor_quadro()
+        if self.tela_inteira_suja:
+            pygame.display.flip()
+        else:
+            if self.estado in ("jogando", "fim"):
+                self.regioes_sujas.extend(self.rects_peoes)
+                if self.rect_grafico:
+                    self.regioes_sujas.append(self.rect_grafico)
+            if self.perfil.ativo:
+                self.regioes_sujas.append(self._rect_perfil())
+            pygame.display.update(self.regioes_sujas)
+        # Guarda a assinatura de antes de compor: se um clique mudou o estado durante o desenho,
+        # o próximo quadro percebe a diferença e redesenha
+        self.assinatura_anterior = assinatura
+        self.tela_inteira_suja = False
+        self.regioes_sujas = []
+
+    def _tratar_evento(self, event):
+        """Processa um evento do pygame; devolve False quando o jogo deve fechar"""
+        rodando = True
+        if event.type == pygame.MOUSEMOTION:
+            self.pos_mouse = event.pos
+            self._verificar_hover(event.pos)
+        elif event.type == EVENTO_GRAFICO_PRONTO:
+            self._receber_grafico()
+        elif event.type == EVENTO_CHANCES_PRONTAS:
+            self.tela_inteira_suja = True
+        else:
+            self.tela_inteira_suja = True
+        if event.type == pygame.QUIT: 
+            rodando = False
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.pos_mouse = event.pos
+            self._clicar(event.pos)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE: 
+                self._jogar_pelo_jogador()
+            if event.key == pygame.K_r: 
+                self.reiniciar()
+            if event.key == pygame.K_t:
+                self.alternar_turbo()
+            if event.key == pygame.K_g:
+                self.alternar_modo_grafico()
+            if event.key == pygame.K_b:
+                self.alternar_banda()
+            if event.key == pygame.K_e:
+                self.exportar_grafico()
+            if event.key == pygame.K_s:
+                self.salvar_registro()
+            if event.key == pygame.K_F3:
+                self.alternar_perfil()
+            if event.key == pygame.K_F4:
+                self.exportar_perfil()
+            if event.key == pygame.K_F9:
+                self.alternar_gravacao()
+            if event.key == pygame.K_ESCAPE: 
+                rodando = False
+        # Redimensionamento: junta a rajada de eventos do arraste e aplica quando o tamanho assenta
+        if event.type == pygame.VIDEORESIZE:
+            self._pedir_redimensionamento(event.size)
+        return rodando and not self.pedido_saida
 
     def rodar(self):
         clock = pygame.time.Clock()
+        dt_ms = 0
         rodando = True
         while rodando:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: 
-                    rodando = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE and self.estado == "jogando": 
-                        self.jogar_dados()
-                    if event.key == pygame.K_r: 
-                        self.reiniciar()
-                    if event.key == pygame.K_ESCAPE: 
-                        rodando = False
-                # Capturar redimensionamento de tela
-                if event.type == pygame.VIDEORESIZE:
-                    self.largura_tela, self.altura_tela = event.size
-                    self.tela = pygame.display.set_mode((self.largura_tela, self.altura_tela), pygame.RESIZABLE)
-                    self._gerar_layout_tabuleiro()
-
-            self.tela.fill(self.C_FUNDO)
-            
-            if self.estado == "menu":
-                self._desenhar_menu()
-            elif self.estado == "selecao_poder":
-                self._desenhar_selecao_poder()
-            else:
-                self._desenhar_painel_esquerdo()
-                self._desenhar_tabuleiro()
-                self._desenhar_peoes()
-            
-            pygame.display.flip()
-            clock.tick(60)
+            eventos = pygame.event.get()
+            if not eventos and self.modo_redesenho == "sujo" and self._ocioso():
+                # Nada acontecendo: bloqueia até o próximo evento em vez de girar a 60 fps
+                eventos = [pygame.event.wait()] + pygame.event.get()
+
+            perfil = self.perfil
+            perfil.iniciar_quadro()
+            inicio = perfil.marcar()
+            for event in eventos:
+                rodando = self._tratar_evento(event) and rodando
+            perfil.acumular("eventos", inicio)
+
+            self._avancar_reproducao(dt_ms)
+            self._avancar_turbo(dt_ms)
+            self._avancar_ia(dt_ms)
+            self._avancar_redimensionamento()
+            self._avancar_timers()
+            self._desenhar_quadro()
+            if self.gravador is not None:
+                self.gravador.capturar(self.tela, pygame.time.get_ticks())
+            perfil.fechar_quadro()
+            dt_ms = clock.tick(60)
+        if self.caminho_registro:
+            self.registro.salvar(self.caminho_registro)
+        if self.grafico_em_segundo_plano is not None:
+            self.grafico_em_segundo_plano.encerrar()
+        # Quadros ainda na fila são gravados antes de sair
+        for gravador in self.gravacoes:
+            gravador.encerrar()
         pygame.quit()
         sys.exit()
 
+def _argumento_semente(texto):
+    """--semente: inteiro de 0 a MAX_SEMENTE (o registro a grava sem sinal, em 64 bits)"""
+    try:
+        semente = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"não é um inteiro: {texto!r}")
+    if not 0 <= semente <= MAX_SEMENTE:
+        raise argparse.ArgumentTypeError(f"deve estar entre 0 e {MAX_SEMENTE}")
+    return semente
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Corrida Estatística")
+    parser.add_argument('--grafico', choices=sorted(MODOS_GRAFICO), default="matplotlib",
+                        help="Renderizador dos gráficos (pygame é mais leve e não carrega o matplotlib)")
+    parser.add_argument('--redesenho', choices=["sujo", "completo"], default="sujo",
+                        help="sujo: atualiza só as regiões alteradas e dorme quando ocioso")
+    parser.add_argument('--semente', type=_argumento_semente, default=None, help="Semente dos dados (sessão reproduzível)")
+    parser.add_argument('--salvar-registro', default=None, help="Grava o registro da sessão neste arquivo ao sair")
+    parser.add_argument('--reproduzir', default=None, help="Reproduz um registro gravado (.cest)")
+    parser.add_argument('--velocidade', type=float, default=10,
+                        help="Eventos por segundo na reprodução (0 = instantâneo)")
+    parser.add_argument('--jogadores', type=int, default=2, choices=range(MIN_JOGADORES, MAX_JOGADORES + 1),
+                        help="Número de jogadores")
+    parser.add_argument('--casas', type=int, default=META, help="Número de casas do tabuleiro")
+    parser.add_argument('--ia', type=int, nargs='+', default=[], metavar="JOGADOR",
+                        help="Jogadores controlados pelo computador (ex.: --ia 2)")
+    parser.add_argument('--banda', action='store_true',
+                        help="Começa mostrando a faixa de 95%% da média acumulada (tecla B alterna)")
+    parser.add_argument('--gravar', default=None, metavar="PASTA",
+                        help="Grava a sessão nesta pasta desde o início (F9 para/retoma)")
+    parser.add_argument('--formato-gravacao', choices=FORMATOS_GRAVACAO, default="png",
+                        help="png: sequência de PNGs; bruto: vídeo RGB24 sem compressão")
+    return parser
+
+
 if __name__ == "__main__":
-    CorridaEstatistica().rodar()
\ No newline at end of file
+    parser = criar_parser()
+    args = parser.parse_args()
+    if args.casas < 2 or args.casas > 0xFFFF:
+        parser.error("--casas deve estar entre 2 e 65535")
+    reproducao = RegistroPartida.carregar(args.reproduzir) if args.reproduzir else None
+    jogo = CorridaEstatistica(modo_grafico=args.grafico, modo_redesenho=args.redesenho, semente=args.semente,
+                              reproducao=reproducao, velocidade_reproducao=args.velocidade,
+                              caminho_registro=args.salvar_registro, n_jogadores=args.jogadores, casas=args.casas,
+                              ia=args.ia, mostrar_banda=args.banda, formato_gravacao=args.formato_gravacao)
+    if args.gravar:
+        jogo.alternar_gravacao(args.gravar)
+    jogo.rodar()
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Busca da melhor política de uso de cada poder, com simulações em todos os núcleos
+
+Uma política é "qual poder, e dispará-lo quando <variável> <comparação> <limiar>". Cada
+política joga contra um oponente sem poder, nas duas posições (quem começa e quem joga
+depois), e a taxa de vitória é a média das duas. As melhores de cada poder são
+reavaliadas com sementes novas, para que o intervalo de confiança não herde o viés de
+escolher o máximo entre muitas estimativas ruidosas.
+
+Uso: python otimizador.py [-n 100000] [--semente 1] [--processos 8] [--poderes dobrar trocar]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from estatisticas import Z_95
+from regras import META, PODERES
+from simulacao import simular_partidas, _indice_poder
+
+# Partidas por tarefa enviada ao pool (várias tarefas por política mantêm todos os núcleos ocupados)
+PARTIDAS_POR_TAREFA = 50_000
+
+
+class Gatilho:
+    """Gatilho picklável para simular_lote: dispara quando `variavel comparacao limiar`"""
+
+    DESCRICOES = {"sempre": "imediatamente", "pos": "casa própria", "pos_oponente": "casa do oponente",
+                  "diferenca": "vantagem (própria - oponente)"}
+
+    def __init__(self, variavel="sempre", comparacao=">=", limiar=0):
+        if variavel not in self.DESCRICOES or comparacao not in (">=", "<="):
+            raise ValueError(f"Gatilho inválido: {variavel} {comparacao} {limiar}")
+        self.variavel = variavel
+        self.comparacao = comparacao
+        self.limiar = limiar
+
+    def __call__(self, pos_proprio, pos_oponente, jogadas):
+        if self.variavel == "sempre":
+            return np.ones(len(pos_proprio), dtype=bool)
+        if self.variavel == "pos":
+            valor = pos_proprio
+        elif self.variavel == "pos_oponente":
+            valor = pos_oponente
+        else:
+            valor = pos_proprio - pos_oponente
+        return valor >= self.limiar if self.comparacao == ">=" else valor <= self.limiar
+
+    def __repr__(self):
+        if self.variavel == "sempre":
+            return self.DESCRICOES["sempre"]
+        # Posições internas começam em 0; na tela a primeira casa é 1
+        limiar = self.limiar + 1 if self.variavel in ("pos", "pos_oponente") else self.limiar
+        return f"{self.DESCRICOES[self.variavel]} {self.comparacao} {limiar}"
+
+
+def politicas_candidatas(meta=META):
+    """Grade de gatilhos avaliada para cada poder"""
+    gatilhos = [Gatilho()]
+    for limiar in range(3, meta - 1, 3):
+        gatilhos.append(Gatilho("pos", ">=", limiar))
+        gatilhos.append(Gatilho("pos_oponente", ">=", limiar))
+    for limiar in range(-15, 16, 3):
+        gatilhos.append(Gatilho("diferenca", "<=", limiar))
+        gatilhos.append(Gatilho("diferenca", ">=", limiar))
+    return gatilhos
+
+
+def _avaliar(tarefa):
+    """Roda em um processo do pool: vitórias da política em uma posição da mesa"""
+    indice, poder, gatilho, assento, n_partidas, semente = tarefa
+    poderes, gatilhos = [None, None], [None, None]
+    poderes[assento], gatilhos[assento] = poder, gatilho
+    res = simular_partidas(n_partidas, poderes=tuple(poderes), gatilhos=tuple(gatilhos), semente=semente,
+                           tamanho_lote=n_partidas)
+    return indice, assento, int(res['vitorias'][assento]), res['partidas'] - res['nao_terminadas']
+
+
+def _tarefas(politicas, n_partidas, sementes):
+    """Divide cada (política, posição) em tarefas de até PARTIDAS_POR_TAREFA partidas"""
+    tarefas = []
+    for indice, (poder, gatilho) in enumerate(politicas):
+        for assento in (0, 1):
+            restantes = n_partidas
+            while restantes > 0:
+                n = min(PARTIDAS_POR_TAREFA, restantes)
+                semente = int(sementes.spawn(1)[0].generate_state(1)[0])
+                tarefas.append((indice, poder, gatilho, assento, n, semente))
+                restantes -= n
+    return tarefas
+
+
+def avaliar_politicas(politicas, n_partidas, sementes, executor):
+    """Taxa de vitória média nas duas posições e intervalo de confiança de 95% de cada política"""
+    vitorias = np.zeros((len(politicas), 2), dtype=np.int64)
+    jogos = np.zeros((len(politicas), 2), dtype=np.int64)
+    for indice, assento, v, n in executor.map(_avaliar, _tarefas(politicas, n_partidas, sementes), chunksize=4):
+        vitorias[indice, assento] += v
+        jogos[indice, assento] += n
+
+    p = vitorias / np.maximum(jogos, 1)
+    taxa = p.mean(axis=1)
+    # As duas posições são amostras independentes: var(média) = (var1 + var2) / 4
+    erro = Z_95 * np.sqrt((p * (1 - p) / np.maximum(jogos, 1)).sum(axis=1)) / 2
+    return taxa, erro, jogos.sum(axis=1)
+
+
+def otimizar(n_partidas=100_000, semente=None, processos=None, poderes=None):
+    """Melhor gatilho de cada poder, reavaliado com sementes independentes"""
+    poderes = list(range(len(PODERES))) if poderes is None else poderes
+    gatilhos = politicas_candidatas()
+    politicas = [(poder, gatilho) for poder in poderes for gatilho in gatilhos]
+    sementes = np.random.SeedSequence(semente)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        taxa, _erro, _jogos = avaliar_politicas(politicas, n_partidas, sementes, executor)
+
+        # Reavalia a melhor de cada poder e o "usar imediatamente" como referência
+        finalistas = []
+        for poder in poderes:
+            indices = [i for i, (p, _g) in enumerate(politicas) if p == poder]
+            melhor = max(indices, key=lambda i: taxa[i])
+            finalistas.append(politicas[melhor])
+            finalistas.append((poder, Gatilho()))
+        taxa_f, erro_f, jogos_f = avaliar_politicas(finalistas, n_partidas, sementes, executor)
+
+    resultado = []
+    for k, poder in enumerate(poderes):
+        i, j = 2 * k, 2 * k + 1
+        resultado.append({
+            'poder': PODERES[poder]['nome'],
+            'politica': repr(finalistas[i][1]),
+            'taxa_vitoria': float(taxa_f[i]), 'ic95': float(erro_f[i]), 'partidas': int(jogos_f[i]),
+            'taxa_imediato': float(taxa_f[j]), 'ic95_imediato': float(erro_f[j]),
+        })
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Otimizador paralelo das políticas de uso dos poderes")
+    parser.add_argument('-n', '--partidas', type=int, default=100_000,
+                        help="Partidas por política em cada posição da mesa")
+    parser.add_argument('--semente', type=int, default=None)
+    parser.add_argument('--processos', type=int, default=None, help="Processos do pool (padrão: todos os núcleos)")
+    parser.add_argument('--poderes', type=_indice_poder, nargs='+', default=None,
+                        help="Poderes avaliados (nome ou índice; padrão: todos)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = otimizar(args.partidas, args.semente, args.processos, args.poderes)
+    duracao = time.perf_counter() - inicio
+
+    n_politicas = len(politicas_candidatas()) * len(resultado)
+    print(f"{n_politicas} políticas x 2 posições x {args.partidas:,} partidas + reavaliação "
+          f"em {duracao:.1f}s ({args.processos or os.cpu_count()} processos)")
+    print("Taxa de vitória contra um oponente sem poder (média das duas posições, IC 95%):")
+    for r in resultado:
+        print(f"  {r['poder']:<20} {r['taxa_vitoria']:.2%} ± {r['ic95']:.2%}  usar quando {r['politica']}")
+        print(f"  {'':<20} {r['taxa_imediato']:.2%} ± {r['ic95_imediato']:.2%}  usar imediatamente")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import csv
+import time
+
+import numpy as np
+
+ETAPAS = ("eventos", "painel", "tabuleiro", "peoes", "grafico")
+# Colunas extras de cada quadro: tempo total de trabalho e intervalo até o quadro anterior
+COLUNAS = ETAPAS + ("quadro", "intervalo")
+INDICE = {nome: i for i, nome in enumerate(COLUNAS)}
+
+
+class Perfilador:
+    """Tempos por etapa dos últimos N quadros em um buffer circular; desligado custa um if por chamada"""
+
+    def __init__(self, capacidade=600):
+        self.ativo = False
+        self.capacidade = capacidade
+        self.tempos = np.zeros((capacidade, len(COLUNAS)))
+        self.total_quadros = 0
+        self._atual = np.zeros(len(COLUNAS))
+        # Soma das etapas já acumuladas no quadro, para descontar as aninhadas da etapa de fora
+        self._medido = 0.0
+        self._inicio_quadro = 0.0
+        self._inicio_anterior = None
+
+    def alternar(self):
+        self.ativo = not self.ativo
+        self._inicio_anterior = None
+        return self.ativo
+
+    def iniciar_quadro(self):
+        if not self.ativo:
+            return
+        self._inicio_quadro = time.perf_counter()
+        self._atual[:] = 0.0
+        self._medido = 0.0
+
+    def marcar(self):
+        """Início de uma etapa (None quando desligado)"""
+        return (time.perf_counter(), self._medido) if self.ativo else None
+
+    def acumular(self, etapa, inicio):
+        """Soma à etapa o tempo decorrido desde `inicio` (devolvido por marcar), sem o das etapas
+        medidas dentro dela: o gráfico gerado dentro do painel conta só como "grafico"
+        """
+        if self.ativo and inicio is not None:
+            instante, medido = inicio
+            ms = (time.perf_counter() - instante) * 1000 - (self._medido - medido)
+            self._atual[INDICE[etapa]] += ms
+            self._medido += ms
+
+    def fechar_quadro(self):
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        self._atual[INDICE["quadro"]] = (agora - self._inicio_quadro) * 1000
+        if self._inicio_anterior is not None:
+            self._atual[INDICE["intervalo"]] = (self._inicio_quadro - self._inicio_anterior) * 1000
+        self._inicio_anterior = self._inicio_quadro
+        self.tempos[self.total_quadros % self.capacidade] = self._atual
+        self.total_quadros += 1
+
+    def recentes(self):
+        """Linhas dos quadros guardados, do mais antigo para o mais novo"""
+        n = min(self.total_quadros, self.capacidade)
+        if self.total_quadros <= self.capacidade:
+            return self.tempos[:n]
+        inicio = self.total_quadros % self.capacidade
+        return np.concatenate((self.tempos[inicio:], self.tempos[:inicio]))
+
+    def resumo(self):
+        """Média e p95 (ms) de cada coluna, e FPS pelo intervalo médio entre quadros"""
+        linhas = self.recentes()
+        if len(linhas) == 0:
+            return None
+        intervalos = linhas[:, INDICE["intervalo"]]
+        intervalos = intervalos[intervalos > 0]
+        return {
+            "media": dict(zip(COLUNAS, linhas.mean(axis=0))),
+            "p95": dict(zip(COLUNAS, np.percentile(linhas, 95, axis=0))),
+            "fps": 1000 / intervalos.mean() if len(intervalos) else 0.0,
+        }
+
+    def histograma(self, coluna, caixas=16):
+        """Contagens dos tempos de uma coluna nos últimos quadros e o limite superior (ms)"""
+        valores = self.recentes()[:, INDICE[coluna]]
+        limite = max(float(valores.max()) if len(valores) else 0.0, 1.0)
+        contagens, _ = np.histogram(valores, bins=caixas, range=(0, limite))
+        return contagens, limite
+
+    def exportar_csv(self, caminho=None):
+        caminho = caminho or time.strftime("perfil_%Y%m%d_%H%M%S.csv")
+        primeiro = max(0, self.total_quadros - self.capacidade)
+        with open(caminho, "w", newline="", encoding="utf-8") as arq:
+            escritor = csv.writer(arq)
+            escritor.writerow(("quadro",) + tuple(f"{c}_ms" for c in COLUNAS))
+            for i, linha in enumerate(self.recentes()):
+                escritor.writerow([primeiro + i] + [f"{v:.4f}" for v in linha])
+        return caminho
@@ -0,0 +1,58 @@
+"""Distribuições exatas da soma de dados, calculadas por convolução e guardadas em cache"""
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=64)
+def pmf_soma(k=2, faces=6, multiplicador=1):
+    """P(soma de k dados de `faces` faces, vezes `multiplicador` = v), indexada por v (0..k*faces*multiplicador)
+
+    O array devolvido é compartilhado entre chamadas e somente leitura.
+    """
+    if k < 1 or faces < 1 or multiplicador < 1:
+        raise ValueError("k, faces e multiplicador devem ser positivos")
+    # Contagens inteiras enquanto cabem em int64 (faces^k combinações); depois, probabilidades em float
+    exato = k * np.log2(faces) < 62
+    um_dado = np.ones(faces, dtype=np.int64 if exato else float)
+    if not exato:
+        um_dado /= faces
+    contagens = np.ones(1, dtype=um_dado.dtype)
+    for _ in range(k):
+        contagens = np.convolve(contagens, um_dado)
+    probs = contagens / faces ** k if exato else contagens
+
+    # contagens[i] corresponde à soma k + i
+    pmf = np.zeros(k * faces * multiplicador + 1)
+    pmf[(np.arange(k, k * faces + 1)) * multiplicador] = probs
+    pmf.flags.writeable = False
+    return pmf
+
+
+@lru_cache(maxsize=64)
+def momentos_soma(k=2, faces=6, multiplicador=1):
+    """Média e variância exatas da soma"""
+    pmf = pmf_soma(k, faces, multiplicador)
+    valores = np.arange(len(pmf))
+    media = float((valores * pmf).sum())
+    return media, float(((valores - media) ** 2 * pmf).sum())
+
+
+def pmf_mistura(componentes, tamanho=None):
+    """Mistura de distribuições em cache: componentes = ((peso, k, faces, multiplicador), ...)"""
+    pmfs = [(peso, pmf_soma(k, f, m)) for peso, k, f, m in componentes if peso > 0]
+    tamanho = tamanho or max((len(p) for _peso, p in pmfs), default=1)
+    mistura = np.zeros(tamanho)
+    for peso, pmf in pmfs:
+        n = min(tamanho, len(pmf))
+        mistura[:n] += peso * pmf[:n]
+    return mistura
+
+
+def pmf_lancamento(fracao_dobrada=0.0, tamanho=None):
+    """Distribuição das somas registradas no jogo: 2d6, dobrada em uma fração dos lançamentos"""
+    return pmf_mistura(((1 - fracao_dobrada, 2, 6, 1), (fracao_dobrada, 2, 6, 2)), tamanho)
+
+
+def media_lancamento(fracao_dobrada=0.0):
+    return (1 - fracao_dobrada) * momentos_soma(2, 6, 1)[0] + fracao_dobrada * momentos_soma(2, 6, 2)[0]
@@ -0,0 +1,121 @@
+"""Log binário compacto dos eventos de uma sessão, para reproduzir partidas bit a bit
+
+Cada evento ocupa 4 bytes: (tipo << 8 | jogador, valor) em dois uint16.
+Uso: python registro.py sessao.cest  (reprodução sem interface, na velocidade máxima)
+"""
+import struct
+import sys
+import time
+from array import array
+
+# Um lote do modo turbo guarda só a quantidade de lançamentos: na reprodução eles saem de novo
+# do gerador NumPy da partida, semeado com a mesma semente
+EVENTO_SELECAO, EVENTO_PODER, EVENTO_ROLAGEM, EVENTO_CASA, EVENTO_REINICIO, EVENTO_LOTE = range(1, 7)
+NOMES_EVENTOS = {EVENTO_SELECAO: "seleção", EVENTO_PODER: "poder", EVENTO_ROLAGEM: "rolagem",
+                 EVENTO_CASA: "casa especial", EVENTO_REINICIO: "reinício", EVENTO_LOTE: "lote turbo"}
+
+# Cabeçalho: assinatura, versão, semente do gerador; a versão 2 acrescenta jogadores e casas
+_CABECALHO = struct.Struct('<4sBQ')
+_CABECALHO_PARTIDA = struct.Struct('<BH')
+_ASSINATURA = b'CEST'
+_VERSAO = 2
+# Configuração implícita dos registros da versão 1
+_JOGADORES_V1, _META_V1 = 2, 30
+# A semente vai no cabeçalho como inteiro de 64 bits sem sinal
+MAX_SEMENTE = 2 ** 64 - 1
+
+
+def codificar_dados(d1, d2):
+    return d1 << 4 | d2
+
+
+def decodificar_dados(valor):
+    return valor >> 4, valor & 0xF
+
+
+class RegistroPartida:
+    """Sequência de eventos (seleção, poder, rolagem, casa especial, reinício) em um array de uint16"""
+
+    def __init__(self, semente=0, n_jogadores=_JOGADORES_V1, meta=_META_V1):
+        self.semente = semente
+        self.n_jogadores = n_jogadores
+        self.meta = meta
+        self.eventos = array('H')
+
+    def registrar(self, tipo, jogador=0, valor=0):
+        self.eventos.append(tipo << 8 | jogador)
+        self.eventos.append(valor)
+
+    def __len__(self):
+        return len(self.eventos) // 2
+
+    def __iter__(self):
+        eventos = self.eventos
+        for i in range(0, len(eventos), 2):
+            yield eventos[i] >> 8, eventos[i] & 0xFF, eventos[i + 1]
+
+    def __getitem__(self, indice):
+        cabeca, valor = self.eventos[2 * indice], self.eventos[2 * indice + 1]
+        return cabeca >> 8, cabeca & 0xFF, valor
+
+    def __eq__(self, outro):
+        return isinstance(outro, RegistroPartida) and self.para_bytes() == outro.para_bytes()
+
+    def para_bytes(self):
+        eventos = array('H', self.eventos)
+        if sys.byteorder == 'big':
+            eventos.byteswap()
+        return (_CABECALHO.pack(_ASSINATURA, _VERSAO, self.semente) +
+                _CABECALHO_PARTIDA.pack(self.n_jogadores, self.meta) + eventos.tobytes())
+
+    @classmethod
+    def de_bytes(cls, dados):
+        assinatura, versao, semente = _CABECALHO.unpack_from(dados)
+        if assinatura != _ASSINATURA or versao not in (1, _VERSAO):
+            raise ValueError("Arquivo de registro inválido ou de versão desconhecida")
+        inicio = _CABECALHO.size
+        n_jogadores, meta = _JOGADORES_V1, _META_V1
+        if versao >= 2:
+            n_jogadores, meta = _CABECALHO_PARTIDA.unpack_from(dados, inicio)
+            inicio += _CABECALHO_PARTIDA.size
+        registro = cls(semente, n_jogadores, meta)
+        registro.eventos.frombytes(dados[inicio:])
+        if sys.byteorder == 'big':
+            registro.eventos.byteswap()
+        return registro
+
+    def salvar(self, caminho):
+        with open(caminho, 'wb') as arq:
+            arq.write(self.para_bytes())
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, 'rb') as arq:
+            return cls.de_bytes(arq.read())
+
+
+def main():
+    from regras import PartidaCorrida
+
+    if len(sys.argv) != 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(2)
+    registro = RegistroPartida.carregar(sys.argv[1])
+
+    inicio = time.perf_counter()
+    partida = PartidaCorrida.reproduzir(registro)
+    duracao = time.perf_counter() - inicio
+
+    identico = partida.registro.para_bytes() == registro.para_bytes()
+    print(f"Eventos: {len(registro)} ({len(registro.para_bytes())} bytes), semente {registro.semente}, "
+          f"{registro.n_jogadores} jogadores, {registro.meta} casas")
+    print(f"Reproduzidos em {duracao * 1000:.1f} ms ({len(registro) / max(duracao, 1e-9):,.0f} eventos/s)")
+    print(f"Reprodução idêntica ao original: {'sim' if identico else 'NÃO'}")
+    for pid in partida.ids_jogadores:
+        print(f"Jogador {pid}: casa {partida.posicoes[pid - 1] + 1}, "
+              f"{partida.estatisticas[pid].n} lançamentos, média {partida.estatisticas[pid].texto()[0]}")
+    sys.exit(0 if identico else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+import random
+
+import numpy as np
+
+from estatisticas import EstatisticasIncrementais
+from historico import BufferJanela, HistoricoMedias
+from registro import (RegistroPartida, EVENTO_SELECAO, EVENTO_PODER, EVENTO_ROLAGEM, EVENTO_CASA,
+                      EVENTO_REINICIO, EVENTO_LOTE, codificar_dados, decodificar_dados)
+
+# --- REGRAS DO TABULEIRO ---
+META = 30
+
+# Casas Especiais: posição -> (tipo, valor, texto)
+CASAS_ESPECIAIS = {
+    3: ("SORTE", 2, "Atalho! +2"), 8: ("SORTE", 3, "Vento! +3"),
+    12: ("SORTE", 1, "Passo! +1"), 18: ("SORTE", 2, "Escada! +2"),
+    22: ("SORTE", 4, "Jato! +4"), 28: ("SORTE", 1, "Quase! +1"),
+    4: ("AZAR", 2, "Queda! -2"), 7: ("AZAR", 3, "Buraco! -3"),
+    11: ("AZAR", 1, "Ops! -1"), 14: ("AZAR", 2, "Volta! -2"),
+    17: ("AZAR", 4, "Crise! -4"), 21: ("AZAR", 2, "Recuo! -2"),
+    26: ("AZAR", 3, "Monstro! -3")
+}
+
+# Sistema de poderes (a ordem define o índice usado nas simulações)
+PODERES = [
+    {"nome": "Dobrar Dados", "descricao": "Próximo lançamento é dobrado", "cor": (255, 150, 50)},
+    {"nome": "Retroceder Oponente", "descricao": "Oponente volta 3 casas", "cor": (200, 80, 80)},
+    {"nome": "Trocar Posições", "descricao": "Troca de lugar com oponente", "cor": (150, 100, 200)},
+    {"nome": "Jogar Novamente", "descricao": "Joga os dados novamente", "cor": (80, 180, 120)}
+]
+PODER_DOBRAR, PODER_RETROCEDER, PODER_TROCAR, PODER_JOGAR_NOVAMENTE = range(len(PODERES))
+RECUO_RETROCEDER = 3
+
+# Maior lote de lançamentos em um único evento do registro (o valor é um uint16)
+MAX_LOTE = 0xFFFF
+
+# Cores dos peões (também usadas nos gráficos), uma por jogador
+CORES_JOGADORES = [(255, 100, 100), (80, 180, 255), (120, 220, 120), (255, 200, 60),
+                   (200, 120, 255), (255, 140, 200), (80, 220, 220), (230, 230, 230)]
+MIN_JOGADORES, MAX_JOGADORES = 2, len(CORES_JOGADORES)
+
+
+def gerar_casas_especiais(meta=META):
+    """Casas especiais para um tabuleiro de `meta` casas: o padrão de 30 casas repetido em blocos"""
+    if meta == META:
+        return dict(CASAS_ESPECIAIS)
+    casas = {}
+    for inicio in range(0, meta, META):
+        for posicao, casa in CASAS_ESPECIAIS.items():
+            if inicio + posicao < meta - 1:
+                casas[inicio + posicao] = casa
+    return casas
+
+
+def tabela_destinos(meta=META, casas_especiais=CASAS_ESPECIAIS):
+    """Posição final após aplicar a casa especial, indexada pela posição de chegada (0..meta)"""
+    tabela = np.arange(meta + 1)
+    for posicao, (tipo, valor, _texto) in casas_especiais.items():
+        if posicao >= meta:
+            continue
+        if tipo == "SORTE":
+            tabela[posicao] = posicao + valor
+        elif tipo == "AZAR":
+            tabela[posicao] = max(0, posicao - valor)
+    return tabela
+
+
+class Instantaneo:
+    """Cópia do que decide a partida (sem históricos, estatísticas nem registro): tamanho fixo por jogador"""
+
+    __slots__ = ('posicoes', 'poder_jogadores', 'poder_usado', 'turno_atual', 'vencedor', 'estado',
+                 'jogador_selecionando_poder', 'poder_dobrar_ativa', 'turno_extra')
+
+    def __init__(self, partida):
+        self.posicoes = partida.posicoes.copy()
+        self.poder_jogadores = partida.poder_jogadores.copy()
+        self.poder_usado = partida.poder_usado.copy()
+        self.turno_atual = partida.turno_atual
+        self.vencedor = partida.vencedor
+        self.estado = partida.estado
+        self.jogador_selecionando_poder = partida.jogador_selecionando_poder
+        self.poder_dobrar_ativa = partida.poder_dobrar_ativa
+        self.turno_extra = partida.turno_extra
+
+
+class PartidaCorrida:
+    """Estado e regras de uma partida, sem pygame: usado pela interface, simulações e scripts
+
+    Os atributos são fixos (__slots__): o servidor mantém milhares de partidas abertas e
+    instantaneo()/restaurar() copiam só o estado que decide a partida.
+    """
+
+    __slots__ = ('semente', 'rng', 'rng_lote', 'registro', 'meta', 'n_jogadores', 'posicoes', 'poder_jogadores',
+                 'poder_usado', 'lancamentos_dobrados', 'jogadores', 'turno_atual', 'vencedor',
+                 'historico_medias', 'historico_lancamentos', 'estatisticas', 'msg_evento', 'timer_evento',
+                 'ultimo_lancamento', 'ultimo_resultado_soma', 'timer_dados_visiveis',
+                 'dados_para_grafico_atualizados', 'poderes_disponiveis', 'poder_dobrar_ativa', 'turno_extra',
+                 'estado', 'jogador_selecionando_poder', 'casas_especiais')
+
+    def __init__(self, semente=None, rng=None, n_jogadores=2, meta=META):
+        # Gerador próprio da partida: a mesma semente reproduz a sessão inteira
+        self.semente = semente if semente is not None else random.randrange(2 ** 32)
+        self.rng = rng if rng is not None else random.Random(self.semente)
+        # Gerador dos lotes do modo turbo, criado no primeiro lote
+        self.rng_lote = None
+        self.registro = RegistroPartida(self.semente, n_jogadores, meta)
+
+        if not MIN_JOGADORES <= n_jogadores <= MAX_JOGADORES:
+            raise ValueError(f"O jogo aceita de {MIN_JOGADORES} a {MAX_JOGADORES} jogadores")
+        self.meta = meta
+        self.n_jogadores = n_jogadores
+        # Estado dos jogadores em arrays contíguos, indexados por id - 1 (ids começam em 1)
+        self.posicoes = np.zeros(n_jogadores, dtype=np.int64)
+        self.poder_jogadores = np.full(n_jogadores, -1, dtype=np.int8)  # índice em PODERES, -1 = nenhum
+        self.poder_usado = np.zeros(n_jogadores, dtype=bool)
+        # Lançamentos feitos com "Dobrar Dados": a distribuição teórica é uma mistura
+        self.lancamentos_dobrados = np.zeros(n_jogadores, dtype=np.int64)
+        # Dados de exibição de cada jogador
+        self.jogadores = {pid: {'dados': BufferJanela(np.uint8), 'cor': CORES_JOGADORES[pid - 1],
+                                'nome': f'Jogador {pid}'} for pid in self.ids_jogadores}
+        self.turno_atual = 1
+        self.vencedor = None
+        # Históricos tipados e limitados: somas e pares de dados (uint8), média acumulada (float32)
+        self.historico_medias = {pid: HistoricoMedias() for pid in self.ids_jogadores}
+        self.historico_lancamentos = {pid: BufferJanela(np.uint8, forma=(2,)) for pid in self.ids_jogadores}
+        self.estatisticas = {pid: EstatisticasIncrementais() for pid in self.ids_jogadores}
+        
+        # Estados de exibição
+        self.msg_evento = ""
+        self.timer_evento = 0
+        self.ultimo_lancamento = (0, 0)
+        self.ultimo_resultado_soma = 0
+        self.timer_dados_visiveis = 0
+        self.dados_para_grafico_atualizados = False
+        
+        # Sistema de poderes; os efeitos pendentes valem só para o próximo lançamento
+        self.poderes_disponiveis = PODERES
+        self.poder_dobrar_ativa = False
+        self.turno_extra = False
+        
+        # Estados do jogo
+        self.estado = "menu"
+        self.jogador_selecionando_poder = 1
+
+        # Casas Especiais
+        self.casas_especiais = gerar_casas_especiais(meta)
+
+    @property
+    def ids_jogadores(self):
+        return range(1, self.n_jogadores + 1)
+
+    def proximo_jogador(self, jogador_id):
+        return jogador_id % self.n_jogadores + 1
+
+    def poder_de(self, jogador_id):
+        """Poder escolhido pelo jogador (dict de PODERES) ou None"""
+        indice = self.poder_jogadores[jogador_id - 1]
+        return self.poderes_disponiveis[indice] if indice >= 0 else None
+
+    def oponente_alvo(self, jogador_id):
+        """Alvo de Retroceder e Trocar: o oponente mais adiantado (no empate, o próximo a jogar)"""
+        ordem = [(jogador_id + k - 1) % self.n_jogadores for k in range(1, self.n_jogadores)]
+        return max(ordem, key=lambda i: self.posicoes[i]) + 1
+
+    def reiniciar(self):
+        self.registro.registrar(EVENTO_REINICIO)
+        self.posicoes[:] = 0
+        self.poder_jogadores[:] = -1
+        self.poder_usado[:] = False
+        self.lancamentos_dobrados[:] = 0
+        self.turno_atual = 1
+        self.vencedor = None
+        self.poder_dobrar_ativa = False
+        self.turno_extra = False
+        for pid in self.jogadores:
+            self.jogadores[pid]['dados'].limpar()
+            self.historico_medias[pid].limpar()
+            self.historico_lancamentos[pid].limpar()
+            self.estatisticas[pid].reiniciar()
+        self.msg_evento = ""
+        self.timer_evento = 0
+        self.timer_dados_visiveis = 0
+        self.ultimo_lancamento = (0, 0)
+        self.estado = "menu"
+        self.jogador_selecionando_poder = 1
+
+    def instantaneo(self):
+        return Instantaneo(self)
+
+    def restaurar(self, instantaneo):
+        """Volta ao estado de um instantâneo; históricos, estatísticas e registro não são desfeitos"""
+        self.posicoes[:] = instantaneo.posicoes
+        self.poder_jogadores[:] = instantaneo.poder_jogadores
+        self.poder_usado[:] = instantaneo.poder_usado
+        self.turno_atual = instantaneo.turno_atual
+        self.vencedor = instantaneo.vencedor
+        self.estado = instantaneo.estado
+        self.jogador_selecionando_poder = instantaneo.jogador_selecionando_poder
+        self.poder_dobrar_ativa = instantaneo.poder_dobrar_ativa
+        self.turno_extra = instantaneo.turno_extra
+
+    def selecionar_poder(self, jogador_id, poder_index):
+        """Atribui um poder ao jogador"""
+        if 0 <= poder_index < len(self.poderes_disponiveis):
+            self.registro.registrar(EVENTO_SELECAO, jogador_id, poder_index)
+            self.poder_jogadores[jogador_id - 1] = poder_index
+            self.poder_usado[jogador_id - 1] = False
+            
+            if jogador_id < self.n_jogadores:
+                self.jogador_selecionando_poder = jogador_id + 1
+            else:
+                self.estado = "jogando"
+
+    def usar_poder(self, jogador_id):
+        """Ativa o poder do jogador atual"""
+        jogador = self.jogadores[jogador_id]
+        poder = self.poder_de(jogador_id)
+        
+        if poder is None or self.poder_usado[jogador_id - 1]:
+            return False
+            
+        poder_nome = poder['nome']
+        self.poder_usado[jogador_id - 1] = True
+        self.registro.registrar(EVENTO_PODER, jogador_id)
+        
+        if poder_nome == "Dobrar Dados":
+            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
+            self.poder_dobrar_ativa = True
+            
+        elif poder_nome == "Retroceder Oponente":
+            alvo = self.oponente_alvo(jogador_id) - 1
+            self.posicoes[alvo] = max(0, self.posicoes[alvo] - RECUO_RETROCEDER)
+            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
+            
+        elif poder_nome == "Trocar Posições":
+            i, alvo = jogador_id - 1, self.oponente_alvo(jogador_id) - 1
+            self.posicoes[[i, alvo]] = self.posicoes[[alvo, i]]
+            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
+            
+        elif poder_nome == "Jogar Novamente":
+            self.msg_evento = f"{jogador['nome']} usou {poder_nome}!"
+            self.turno_extra = True
+            
+        self.timer_evento = 120
+        return True
+
+    def jogar_dados(self, dados=None):
+        """Lança os dados da vez; `dados` força o resultado (usado na reprodução de registros)"""
+        if self.vencedor or self.estado != "jogando": 
+            return
+
+        jog = self.jogadores[self.turno_atual]
+        
+        if dados is None:
+            d1 = self.rng.randint(1, 6)
+            d2 = self.rng.randint(1, 6)
+        else:
+            d1, d2 = dados
+        self.registro.registrar(EVENTO_ROLAGEM, self.turno_atual, codificar_dados(d1, d2))
+        soma = d1 + d2
+        
+        # Aplicar poder de dobrar dados se estiver ativo
+        if self.poder_dobrar_ativa:
+            soma = soma * 2
+            self.poder_dobrar_ativa = False
+            self.lancamentos_dobrados[self.turno_atual - 1] += 1
+            self.msg_evento = f"Dados dobrados! Movimento: {soma} casas"
+        else:
+            self.msg_evento = f"Movimento: {soma} casas"
+            
+        self.timer_evento = 90
+            
+        self.ultimo_lancamento = (d1, d2)
+        self.ultimo_resultado_soma = soma
+        self.timer_dados_visiveis = 90
+        
+        # Armazenar dados para estatísticas
+        jog['dados'].adicionar(soma)
+        estat = self.estatisticas[self.turno_atual]
+        estat.adicionar(soma)
+        self.historico_lancamentos[self.turno_atual].adicionar((d1, d2))
+        self.historico_medias[self.turno_atual].adicionar(estat.media)
+        self.dados_para_grafico_atualizados = True
+        
+        # MOVIMENTO CORRETO: usar o valor real da soma
+        i = self.turno_atual - 1
+        self.posicoes[i] += soma
+        
+        # Verificar casas especiais apenas na posição final (evita recursão)
+        self._verificar_consequencias_final(int(self.posicoes[i]))
+        
+        # Verificar vitória
+        if self.posicoes[i] >= self.meta - 1:
+            self.posicoes[i] = self.meta - 1
+            self.vencedor = self.turno_atual
+            self.msg_evento = f"{jog['nome']} VENCEU!"
+            self.estado = "fim"
+        
+        # Mudar turno (a menos que haja turno extra, que é consumido mesmo com vitória)
+        if self.turno_extra:
+            self.turno_extra = False
+        elif not self.vencedor:
+            self.turno_atual = self.proximo_jogador(self.turno_atual)
+
+    def rolar_lote(self, n, jogador=None):
+        """Lança n vezes de uma vez só para as estatísticas (modo turbo): os peões não se movem
+
+        Os lançamentos seguem a ordem dos jogadores a partir de `jogador` (padrão: o da vez) e
+        são sorteados em bloco por um gerador NumPy, com histogramas e históricos atualizados em lote.
+        """
+        jogador = jogador or self.turno_atual
+        if self.rng_lote is None:
+            self.rng_lote = np.random.default_rng(self.semente)
+        while n > 0:
+            tamanho = min(n, MAX_LOTE)
+            n -= tamanho
+            self.registro.registrar(EVENTO_LOTE, jogador, tamanho)
+            dados = self.rng_lote.integers(1, 7, size=(tamanho, 2), dtype=np.uint8)
+            somas = dados.sum(axis=1, dtype=np.uint8)
+            n_jog = self.n_jogadores
+            for k in range(n_jog):
+                pid = (jogador + k - 1) % n_jog + 1
+                self._acumular_lote(pid, dados[k::n_jog], somas[k::n_jog])
+            jogador = (jogador + tamanho - 1) % n_jog + 1
+            self.ultimo_lancamento = tuple(int(d) for d in dados[-1])
+            self.ultimo_resultado_soma = int(somas[-1])
+        self.dados_para_grafico_atualizados = True
+
+    def _acumular_lote(self, pid, dados, somas):
+        if len(somas) == 0:
+            return
+        estat = self.estatisticas[pid]
+        soma_anterior, n_anterior = estat.soma, estat.n
+        estat.adicionar_lote(somas)
+        self.jogadores[pid]['dados'].estender(somas)
+        self.historico_lancamentos[pid].estender(dados)
+        medias = (soma_anterior + np.cumsum(somas, dtype=np.int64)) / (n_anterior + np.arange(1, len(somas) + 1))
+        self.historico_medias[pid].estender(medias)
+
+    def _verificar_consequencias_final(self, posicao):
+        """Verifica consequências apenas na posição final (evita recursão infinita)"""
+        if posicao >= self.meta:
+            return
+            
+        if posicao in self.casas_especiais:
+            tipo, valor, texto = self.casas_especiais[posicao]
+            i = self.turno_atual - 1
+            self.registro.registrar(EVENTO_CASA, self.turno_atual, posicao)
+            
+            self.msg_evento = f"{texto} na casa {posicao + 1}"
+            self.timer_evento = 120
+            
+            if tipo == "SORTE":
+                self.posicoes[i] += valor
+                self.msg_evento += f" (+{valor})"
+            elif tipo == "AZAR":
+                self.posicoes[i] = max(0, self.posicoes[i] - valor)
+                self.msg_evento += f" (-{valor})"
+
+    def aplicar_evento(self, tipo, jogador, valor):
+        """Reaplica um evento gravado; as rolagens usam os dados do registro, não o gerador"""
+        if tipo == EVENTO_SELECAO:
+            if self.estado == "menu":
+                self.estado = "selecao_poder"
+            self.selecionar_poder(jogador, valor)
+        elif tipo == EVENTO_PODER:
+            self.usar_poder(jogador)
+        elif tipo == EVENTO_ROLAGEM:
+            self.jogar_dados(dados=decodificar_dados(valor))
+        elif tipo == EVENTO_REINICIO:
+            self.reiniciar()
+        elif tipo == EVENTO_LOTE:
+            self.rolar_lote(valor, jogador)
+        # EVENTO_CASA é consequência da rolagem e é gravado de novo por ela
+
+    @classmethod
+    def reproduzir(cls, registro):
+        """Reproduz uma sessão gravada sem interface, na velocidade máxima"""
+        partida = cls(semente=registro.semente, n_jogadores=registro.n_jogadores, meta=registro.meta)
+        for evento in registro:
+            partida.aplicar_evento(*evento)
+        return partida
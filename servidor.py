@@ -0,0 +1,342 @@
+"""Servidor sem interface para torneios: milhares de partidas simultâneas em um só processo (asyncio)
+
+Cada conexão ocupa um assento de uma partida. Protocolo de linhas em texto, um comando por
+linha e exatamente uma resposta por comando:
+
+  NOVA [jogadores] [casas] [semente]  -> OK <partida> <jogador>   cria a partida e ocupa o assento 1
+  ENTRAR <partida>                    -> OK <partida> <jogador>   ocupa o próximo assento livre
+  PODER <índice>                      -> OK                       escolhe o poder, na ordem dos assentos
+  USAR                                -> OK                       usa o poder na sua vez
+  JOGAR                               -> OK <d1> <d2> <soma> <casa>
+  ESPERAR                             -> como ESTADO, quando for sua vez ou a partida acabar
+  ESTADO                              -> OK <estado> <vez> <vencedor> <casa1,casa2,...>
+  INFO                                -> OK partidas=<n> conexoes=<n> comandos=<n> memoria_kb=<n> pico_memoria_kb=<n>
+  SAIR
+
+memoria_kb é a memória residente atual (0 onde não há /proc) e pico_memoria_kb o pico desde o início.
+Um cliente que desconecta durante ESPERAR libera o assento na hora (a partida é abandonada).
+Erros: ERRO <motivo>. As casas começam em 1, como na tela; vez e vencedor 0 = ninguém.
+A partida começa (menu -> selecao_poder) quando todos os assentos estão ocupados.
+
+Uso: python servidor.py [--host 127.0.0.1] [--porta 5050] [--max-partidas 10000]
+"""
+import argparse
+import asyncio
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from regras import PartidaCorrida, PODERES, META, MIN_JOGADORES, MAX_JOGADORES
+from registro import MAX_SEMENTE
+
+PORTA_PADRAO = 5050
+# Linhas maiores que isso derrubam a conexão (nenhum comando válido chega perto)
+MAX_LINHA = 256
+
+
+def memoria_residente_kb():
+    """Memória residente atual do processo (Linux: /proc/self/statm); 0 se não der para medir"""
+    try:
+        with open("/proc/self/statm") as arq:
+            paginas = int(arq.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return paginas * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _inteiro(argumentos):
+    """O único argumento de um comando, como inteiro"""
+    if len(argumentos) != 1:
+        raise ValueError("esperado um argumento")
+    return int(argumentos[0])
+
+
+class Sala:
+    """Uma partida do servidor: as regras de PartidaCorrida, os assentos ocupados e quem espera a vez"""
+
+    def __init__(self, id_sala, partida):
+        self.id = id_sala
+        self.partida = partida
+        self.ocupados = 0
+        self.conectados = 0
+        self.abandonada = False
+        # jogador -> Future resolvido quando chegar a vez dele (ESPERAR)
+        self.esperando = {}
+
+    @property
+    def cheia(self):
+        return self.ocupados == self.partida.n_jogadores
+
+    def vez(self):
+        """Jogador que deve agir agora (0 antes de todos entrarem e depois do fim)"""
+        partida = self.partida
+        if partida.estado == "selecao_poder":
+            return partida.jogador_selecionando_poder
+        if partida.estado == "jogando":
+            return partida.turno_atual
+        return 0
+
+    def pode_seguir(self, jogador):
+        return self.abandonada or self.partida.estado == "fim" or self.vez() == jogador
+
+    def notificar(self):
+        for jogador, futuro in list(self.esperando.items()):
+            if not futuro.done() and self.pode_seguir(jogador):
+                futuro.set_result(None)
+
+    def descrever(self):
+        partida = self.partida
+        estado = "abandonada" if self.abandonada else partida.estado
+        casas = ",".join(str(int(p) + 1) for p in partida.posicoes)
+        return f"OK {estado} {self.vez()} {partida.vencedor or 0} {casas}"
+
+
+class ServidorCorrida:
+    """Atende as conexões e guarda as salas; todo o estado vive na thread do laço asyncio"""
+
+    def __init__(self, max_partidas=10_000):
+        self.max_partidas = max_partidas
+        self.salas = {}
+        self.proximo_id = 1
+        self.conexoes = 0
+        self.comandos = 0
+
+    async def atender(self, leitor, escritor):
+        self.conexoes += 1
+        conexao = {'sala': None, 'jogador': 0}
+        try:
+            while True:
+                # Uma leitura iniciada durante ESPERAR continua valendo como o próximo comando
+                leitura = conexao.pop('leitura', None)
+                try:
+                    linha = await (leitura or leitor.readline())
+                except (ValueError, ConnectionError):  # linha longa demais ou conexão derrubada
+                    break
+                if not linha:
+                    break
+                partes = linha.decode('ascii', 'replace').split()
+                if not partes:
+                    continue
+                if partes[0].upper() == "SAIR":
+                    break
+                self.comandos += 1
+                resposta = self.executar(conexao, partes)
+                if resposta is None:
+                    resposta = await self._esperar(conexao, leitor)
+                    if resposta is None:  # desconectou esperando a vez
+                        break
+                escritor.write(resposta.encode('ascii') + b"\n")
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            leitura = conexao.pop('leitura', None)
+            if leitura is not None:
+                leitura.cancel()
+            self.conexoes -= 1
+            self._sair(conexao)
+            escritor.close()
+
+    def executar(self, conexao, partes):
+        """Resposta do comando, ou None para ESPERAR (que é assíncrono)"""
+        comando, argumentos = partes[0].upper(), partes[1:]
+        try:
+            if comando == "NOVA":
+                return self._nova(conexao, *[int(a) for a in argumentos])
+            if comando == "ENTRAR":
+                return self._entrar(conexao, _inteiro(argumentos))
+            if comando == "INFO":
+                return self._info()
+        except (TypeError, ValueError):
+            return "ERRO argumentos"
+        if comando not in ("PODER", "USAR", "JOGAR", "ESPERAR", "ESTADO"):
+            return "ERRO comando"
+
+        sala, jogador = conexao['sala'], conexao['jogador']
+        if sala is None:
+            return "ERRO sem_partida"
+        if comando == "ESTADO":
+            return sala.descrever()
+        if comando == "ESPERAR":
+            return None
+        if sala.abandonada:
+            return "ERRO abandonada"
+        if sala.vez() != jogador:
+            return "ERRO vez"
+
+        partida = sala.partida
+        if comando == "PODER":
+            if partida.estado != "selecao_poder":
+                return "ERRO estado"
+            try:
+                indice = _inteiro(argumentos)
+            except (TypeError, ValueError):
+                return "ERRO argumentos"
+            if not 0 <= indice < len(PODERES):
+                return "ERRO poder"
+            partida.selecionar_poder(jogador, indice)
+            resposta = "OK"
+        elif partida.estado != "jogando":
+            return "ERRO estado"
+        elif comando == "USAR":
+            if not partida.usar_poder(jogador):
+                return "ERRO poder"
+            resposta = "OK"
+        else:
+            partida.jogar_dados()
+            d1, d2 = partida.ultimo_lancamento
+            resposta = f"OK {d1} {d2} {partida.ultimo_resultado_soma} {int(partida.posicoes[jogador - 1]) + 1}"
+        sala.notificar()
+        return resposta
+
+    def _nova(self, conexao, n_jogadores=2, casas=META, semente=None):
+        if conexao['sala'] is not None:
+            return "ERRO ja_em_partida"
+        if not MIN_JOGADORES <= n_jogadores <= MAX_JOGADORES or not 2 <= casas <= 0xFFFF:
+            return "ERRO argumentos"
+        if semente is not None and not 0 <= semente <= MAX_SEMENTE:
+            return "ERRO argumentos"
+        if len(self.salas) >= self.max_partidas:
+            return "ERRO servidor_cheio"
+        sala = Sala(self.proximo_id, PartidaCorrida(semente=semente, n_jogadores=n_jogadores, meta=casas))
+        self.proximo_id += 1
+        self.salas[sala.id] = sala
+        return self._ocupar(conexao, sala)
+
+    def _entrar(self, conexao, id_sala):
+        if conexao['sala'] is not None:
+            return "ERRO ja_em_partida"
+        sala = self.salas.get(id_sala)
+        if sala is None:
+            return "ERRO partida"
+        if sala.cheia or sala.abandonada:
+            return "ERRO cheia"
+        return self._ocupar(conexao, sala)
+
+    def _ocupar(self, conexao, sala):
+        sala.ocupados += 1
+        sala.conectados += 1
+        conexao['sala'], conexao['jogador'] = sala, sala.ocupados
+        if sala.cheia:
+            sala.partida.estado = "selecao_poder"
+            sala.partida.jogador_selecionando_poder = 1
+            sala.notificar()
+        return f"OK {sala.id} {sala.ocupados}"
+
+    async def _esperar(self, conexao, leitor):
+        """Estado quando chegar a vez; None se o cliente desconectar antes
+
+        A espera corre junto com a leitura da conexão, para notar a desconexão sem depender
+        da jogada de outro jogador. Uma linha que chegue antes da hora fica para depois.
+        """
+        sala, jogador = conexao['sala'], conexao['jogador']
+        if not sala.pode_seguir(jogador):
+            futuro = asyncio.get_running_loop().create_future()
+            sala.esperando[jogador] = futuro
+            leitura = conexao['leitura'] = asyncio.ensure_future(leitor.readline())
+            try:
+                await asyncio.wait((futuro, leitura), return_when=asyncio.FIRST_COMPLETED)
+                if not futuro.done() and (leitura.exception() is not None or not leitura.result()):
+                    return None
+                await futuro
+            finally:
+                sala.esperando.pop(jogador, None)
+        return sala.descrever()
+
+    def _sair(self, conexao):
+        """Libera o assento; sair antes do fim abandona a partida para os outros"""
+        sala = conexao['sala']
+        if sala is None:
+            return
+        conexao['sala'] = None
+        sala.conectados -= 1
+        if sala.partida.estado != "fim":
+            sala.abandonada = True
+            sala.notificar()
+        if sala.conectados == 0:
+            del self.salas[sala.id]
+
+    def _info(self):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+        return (f"OK partidas={len(self.salas)} conexoes={self.conexoes} comandos={self.comandos} "
+                f"memoria_kb={memoria_residente_kb()} pico_memoria_kb={pico}")
+
+
+class ClienteCorrida:
+    """Cliente mínimo do protocolo: uma conexão = um assento"""
+
+    def __init__(self, leitor, escritor):
+        self.leitor = leitor
+        self.escritor = escritor
+
+    @classmethod
+    async def conectar(cls, host="127.0.0.1", porta=PORTA_PADRAO):
+        return cls(*await asyncio.open_connection(host, porta))
+
+    async def pedir(self, *comando):
+        """Envia um comando e devolve a resposta já dividida; ERRO vira RuntimeError"""
+        self.escritor.write(" ".join(str(c) for c in comando).encode('ascii') + b"\n")
+        await self.escritor.drain()
+        resposta = (await self.leitor.readline()).decode('ascii').split()
+        if not resposta or resposta[0] != "OK":
+            raise RuntimeError(f"{' '.join(map(str, comando))}: {' '.join(resposta) or 'conexão encerrada'}")
+        return resposta[1:]
+
+    async def fechar(self):
+        self.escritor.write(b"SAIR\n")
+        self.escritor.close()
+        try:
+            await self.escritor.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def aumentar_limite_arquivos():
+    """Sobe o limite de descritores abertos até o máximo permitido (cada conexão usa um)"""
+    if resource is None:
+        return None
+    suave, rigido = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if rigido == resource.RLIM_INFINITY or rigido > suave:
+        novo = rigido if rigido != resource.RLIM_INFINITY else max(suave, 65536)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (novo, rigido))
+            suave = novo
+        except (ValueError, OSError):
+            pass
+    return suave
+
+
+async def servir(host="127.0.0.1", porta=PORTA_PADRAO, max_partidas=10_000, pronto=None):
+    servidor = ServidorCorrida(max_partidas)
+    tcp = await asyncio.start_server(servidor.atender, host, porta, limit=MAX_LINHA, backlog=4096)
+    if pronto is not None:
+        pronto(tcp)
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de partidas sem interface (protocolo de linhas)")
+    parser.add_argument('--host', default="127.0.0.1", help="Endereço local (padrão: só esta máquina)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--max-partidas', type=int, default=10_000)
+    args = parser.parse_args()
+
+    limite = aumentar_limite_arquivos()
+
+    def pronto(tcp):
+        enderecos = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in tcp.sockets)
+        print(f"Servindo em {enderecos} (até {args.max_partidas:,} partidas, {limite or '?'} descritores)",
+              flush=True)
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.max_partidas, pronto))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
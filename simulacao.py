@@ -0,0 +1,168 @@
+"""Motor Monte Carlo vetorizado (sem pygame) com as regras de CorridaEstatistica"""
+import argparse
+import time
+
+import numpy as np
+
+from regras import (META, CASAS_ESPECIAIS, PODERES, PODER_DOBRAR, PODER_RETROCEDER,
+                    PODER_TROCAR, PODER_JOGAR_NOVAMENTE, RECUO_RETROCEDER, tabela_destinos)
+
+
+def usar_imediatamente(pos_proprio, pos_oponente, jogadas):
+    """Gatilho padrão: dispara o poder na primeira vez de jogar"""
+    return np.ones(len(pos_proprio), dtype=bool)
+
+
+def _aplicar_poderes(ids, jogador, poder, gatilho, pos, turno, usado, dobrar, extra, jogadas):
+    """Dispara, nas partidas em que o gatilho aceita, o poder do jogador da vez (como usar_poder)"""
+    candidatos = ids[(turno[ids] == jogador) & ~usado[ids, jogador]]
+    if candidatos.size == 0:
+        return
+    oponente = 1 - jogador
+    disparar = candidatos[gatilho(pos[candidatos, jogador], pos[candidatos, oponente], jogadas[candidatos])]
+    if disparar.size == 0:
+        return
+
+    usado[disparar, jogador] = True
+    if poder == PODER_DOBRAR:
+        dobrar[disparar] = True
+    elif poder == PODER_RETROCEDER:
+        pos[disparar, oponente] = np.maximum(0, pos[disparar, oponente] - RECUO_RETROCEDER)
+    elif poder == PODER_TROCAR:
+        pos[disparar] = pos[disparar][:, ::-1]
+    elif poder == PODER_JOGAR_NOVAMENTE:
+        extra[disparar] = True
+
+
+def simular_lote(n_partidas, rng, poderes=(None, None), gatilhos=(None, None),
+                 meta=META, casas_especiais=CASAS_ESPECIAIS, max_jogadas=1000):
+    """Joga n_partidas completas em paralelo; cada iteração avança um lançamento em todas as ativas"""
+    destinos = tabela_destinos(meta, casas_especiais)
+    gatilhos = [g or usar_imediatamente for g in gatilhos]
+
+    pos = np.zeros((n_partidas, 2), dtype=np.int64)
+    turno = np.zeros(n_partidas, dtype=np.int64)  # 0 = Jogador 1, 1 = Jogador 2
+    usado = np.zeros((n_partidas, 2), dtype=bool)
+    dobrar = np.zeros(n_partidas, dtype=bool)
+    extra = np.zeros(n_partidas, dtype=bool)
+    jogadas = np.zeros(n_partidas, dtype=np.int64)
+    vencedor = np.full(n_partidas, -1, dtype=np.int64)
+    frequencia_casas = np.zeros(meta, dtype=np.int64)
+
+    ativos = np.arange(n_partidas)
+    for _ in range(max_jogadas):
+        if ativos.size == 0:
+            break
+
+        for jogador in (0, 1):
+            if poderes[jogador] is not None:
+                _aplicar_poderes(ativos, jogador, poderes[jogador], gatilhos[jogador],
+                                 pos, turno, usado, dobrar, extra, jogadas)
+
+        t = turno[ativos]
+        soma = rng.integers(1, 7, size=(ativos.size, 2)).sum(axis=1)
+        soma = np.where(dobrar[ativos], soma * 2, soma)
+        dobrar[ativos] = False
+
+        # Casas especiais só valem na posição de chegada (sem encadeamento)
+        chegada = np.minimum(pos[ativos, t] + soma, meta)
+        frequencia_casas += np.bincount(np.minimum(chegada, meta - 1), minlength=meta)
+        nova = destinos[chegada]
+
+        venceu = nova >= meta - 1
+        pos[ativos, t] = np.minimum(nova, meta - 1)
+        jogadas[ativos] += 1
+        vencedor[ativos[venceu]] = t[venceu]
+
+        # Turno extra é consumido no lançamento seguinte, com ou sem vitória
+        turno[ativos] = np.where(extra[ativos], t, 1 - t)
+        extra[ativos] = False
+        ativos = ativos[~venceu]
+
+    terminadas = vencedor >= 0
+    return {
+        'partidas': n_partidas,
+        'vitorias': np.bincount(vencedor[terminadas], minlength=2),
+        'nao_terminadas': int(n_partidas - terminadas.sum()),
+        'dist_turnos': np.bincount(jogadas[terminadas], minlength=1),
+        'frequencia_casas': frequencia_casas,
+    }
+
+
+def _somar_resultados(total, parcial):
+    """Acumula o resultado de um lote no total"""
+    if total is None:
+        return parcial
+    tam = max(len(total['dist_turnos']), len(parcial['dist_turnos']))
+    dist = np.zeros(tam, dtype=np.int64)
+    dist[:len(total['dist_turnos'])] += total['dist_turnos']
+    dist[:len(parcial['dist_turnos'])] += parcial['dist_turnos']
+    return {
+        'partidas': total['partidas'] + parcial['partidas'],
+        'vitorias': total['vitorias'] + parcial['vitorias'],
+        'nao_terminadas': total['nao_terminadas'] + parcial['nao_terminadas'],
+        'dist_turnos': dist,
+        'frequencia_casas': total['frequencia_casas'] + parcial['frequencia_casas'],
+    }
+
+
+def simular_partidas(n_partidas, poderes=(None, None), gatilhos=(None, None), semente=None,
+                     tamanho_lote=200_000, meta=META, casas_especiais=CASAS_ESPECIAIS):
+    """Simula n_partidas em lotes e devolve vitórias, distribuição de turnos e frequência das casas"""
+    rng = np.random.default_rng(semente)
+    total = None
+    restantes = n_partidas
+    while restantes > 0:
+        n = min(tamanho_lote, restantes)
+        total = _somar_resultados(total, simular_lote(n, rng, poderes, gatilhos, meta, casas_especiais))
+        restantes -= n
+
+    terminadas = max(1, total['partidas'] - total['nao_terminadas'])
+    total['taxa_vitoria'] = total['vitorias'] / terminadas
+    dist = total['dist_turnos']
+    total['turnos_medio'] = float((np.arange(len(dist)) * dist).sum() / terminadas)
+    return total
+
+
+def _indice_poder(nome):
+    """Converte o nome (ou índice) de um poder da linha de comando"""
+    if nome is None or nome == "-":
+        return None
+    if nome.isdigit():
+        return int(nome)
+    for i, poder in enumerate(PODERES):
+        if poder['nome'].lower().startswith(nome.lower()):
+            return i
+    raise argparse.ArgumentTypeError(f"Poder desconhecido: {nome}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo da Corrida Estatística")
+    parser.add_argument('-n', '--partidas', type=int, default=1_000_000)
+    parser.add_argument('--semente', type=int, default=None)
+    parser.add_argument('--poder1', type=_indice_poder, default=None,
+                        help="Poder do Jogador 1 (nome ou índice; usado na primeira jogada)")
+    parser.add_argument('--poder2', type=_indice_poder, default=None,
+                        help="Poder do Jogador 2 (nome ou índice; usado na primeira jogada)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    res = simular_partidas(args.partidas, poderes=(args.poder1, args.poder2), semente=args.semente)
+    duracao = time.perf_counter() - inicio
+
+    print(f"Partidas: {res['partidas']} em {duracao:.2f}s ({res['partidas'] / duracao:,.0f} partidas/s)")
+    for pid in [1, 2]:
+        print(f"Vitórias Jogador {pid}: {res['vitorias'][pid - 1]} ({res['taxa_vitoria'][pid - 1]:.2%})")
+    print(f"Lançamentos por partida: média {res['turnos_medio']:.2f}")
+    dist = res['dist_turnos']
+    for n, qtd in enumerate(dist):
+        if qtd:
+            print(f"  {n:3d}: {qtd / res['partidas']:.4f}")
+    print("Frequência de chegada por casa:")
+    total_chegadas = res['frequencia_casas'].sum()
+    for casa, qtd in enumerate(res['frequencia_casas']):
+        print(f"  Casa {casa + 1:2d}: {qtd / total_chegadas:.4f}")
+
+
+if __name__ == "__main__":
+    main()
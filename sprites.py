@@ -0,0 +1,101 @@
+"""Faces dos dados e peões pré-renderizados em atlas com alfa por pixel
+
+Cada atlas é uma única superfície desenhada uma vez por escala (lado do dado ou raio do
+peão), com aceleração RLE (os cantos transparentes são pulados no blit); desenhar passa a
+ser um blit de uma área do atlas. As escalas usadas por último ficam em cache, então voltar
+a um tamanho de janela já visto não redesenha nada.
+"""
+import pygame
+
+from cache_tamanho import CachePorTamanho
+
+COR_SOMBRA_DADO, COR_SOMBRA_PEAO = (10, 10, 10), (0, 0, 0)
+COR_DADO, COR_BORDA_DADO, COR_PONTO = (245, 245, 245), (20, 20, 20), (0, 0, 0)
+# Sombra deslocada 2 pixels: cada sprite de dado tem essa folga à direita e embaixo
+FOLGA_SOMBRA = 2
+
+
+def pontos_dado(valor, tamanho):
+    """Centros dos pontos de uma face, relativos ao canto do dado"""
+    a, m, b = tamanho // 4, tamanho // 2, 3 * tamanho // 4
+    return {
+        1: [(m, m)],
+        2: [(a, a), (b, b)],
+        3: [(a, a), (m, m), (b, b)],
+        4: [(a, a), (b, a), (a, b), (b, b)],
+        5: [(a, a), (b, a), (m, m), (a, b), (b, b)],
+        6: [(a, a), (b, a), (a, m), (b, m), (a, b), (b, b)],
+    }[valor]
+
+
+def margem_peao(raio):
+    """Distância do centro do peão à borda do sprite (cobre a sombra e o anel de destaque)"""
+    return raio + 5
+
+
+def _preparar(atlas):
+    """Formato da tela (quando já existe uma) e RLE para o alfa"""
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    atlas.set_alpha(255, pygame.RLEACCEL)
+    return atlas
+
+
+class AtlasSprites:
+    """Sprites dos dados (por lado) e dos peões (por raio, cores e cor de destaque)"""
+
+    def __init__(self, escalas=4):
+        self._dados = CachePorTamanho(escalas)
+        self._peoes = CachePorTamanho(escalas)
+        self.atlas_gerados = 0
+
+    def desenhar_dado(self, destino, pos, valor, tamanho):
+        """Face `valor` (1 a 6) com sombra, com o canto do dado em `pos`; devolve o retângulo alterado"""
+        atlas = self._dados.obter(tamanho)
+        if atlas is None:
+            atlas = self._gerar_dados(tamanho)
+            self._dados.guardar(tamanho, atlas)
+        lado = tamanho + FOLGA_SOMBRA
+        return destino.blit(atlas, pos, ((valor - 1) * lado, 0, lado, lado))
+
+    def desenhar_peao(self, destino, centro, indice, raio, cores, cor_destaque, destaque=False):
+        """Peão do jogador `indice` (base 0) centrado em `centro`; devolve o retângulo alterado"""
+        chave = (raio, tuple(cores), tuple(cor_destaque))
+        atlas = self._peoes.obter(chave)
+        if atlas is None:
+            atlas = self._gerar_peoes(raio, cores, cor_destaque)
+            self._peoes.guardar(chave, atlas)
+        m = margem_peao(raio)
+        lado = 2 * m + 1
+        return destino.blit(atlas, (centro[0] - m, centro[1] - m), (indice * lado, destaque * lado, lado, lado))
+
+    def _gerar_dados(self, tamanho):
+        lado = tamanho + FOLGA_SOMBRA
+        atlas = pygame.Surface((6 * lado, lado), pygame.SRCALPHA)
+        raio = tamanho // 9
+        for valor in range(1, 7):
+            x = (valor - 1) * lado
+            rect = pygame.Rect(x, 0, tamanho, tamanho)
+            pygame.draw.rect(atlas, COR_SOMBRA_DADO, rect.move(FOLGA_SOMBRA, FOLGA_SOMBRA), border_radius=8)
+            pygame.draw.rect(atlas, COR_DADO, rect, border_radius=8)
+            pygame.draw.rect(atlas, COR_BORDA_DADO, rect, 2, border_radius=8)
+            for px, py in pontos_dado(valor, tamanho):
+                pygame.draw.circle(atlas, COR_PONTO, (x + px, py), raio)
+        self.atlas_gerados += 1
+        return _preparar(atlas)
+
+    def _gerar_peoes(self, raio, cores, cor_destaque):
+        """Uma linha sem destaque e outra com o anel da vez, uma coluna por jogador"""
+        m = margem_peao(raio)
+        lado = 2 * m + 1
+        atlas = pygame.Surface((len(cores) * lado, 2 * lado), pygame.SRCALPHA)
+        for destaque in (False, True):
+            for indice, cor in enumerate(cores):
+                centro = (indice * lado + m, destaque * lado + m)
+                pygame.draw.circle(atlas, COR_SOMBRA_PEAO, (centro[0] + 2, centro[1] + 2), raio + 2)
+                pygame.draw.circle(atlas, cor, centro, raio)
+                pygame.draw.circle(atlas, (255, 255, 255), centro, raio, 2 if raio >= 6 else 1)
+                if destaque:
+                    pygame.draw.circle(atlas, cor_destaque, centro, raio + 4, 3 if raio >= 6 else 2)
+        self.atlas_gerados += 1
+        return _preparar(atlas)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Testes sem janela nem áudio; os módulos do jogo ficam na raiz do repositório
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,134 @@
+import pygame
+import pytest
+
+from graficos import GraficoPygame
+from jogo import CorridaEstatistica, criar_parser
+from registro import MAX_SEMENTE, RegistroPartida
+
+
+@pytest.fixture
+def jogo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jogo = CorridaEstatistica(semente=1, grafico_assincrono=False)
+    yield jogo
+    pygame.quit()
+
+
+def _quadros(jogo, n):
+    for _ in range(n):
+        jogo._avancar_timers()
+        jogo._desenhar_quadro()
+
+
+def _tecla(jogo, tecla):
+    jogo._tratar_evento(pygame.event.Event(pygame.KEYDOWN, key=tecla, mod=0, unicode="", scancode=0))
+
+
+def test_ocioso_depois_de_reiniciar_com_mensagem(jogo):
+    jogo._iniciar_selecao()
+    jogo.selecionar_poder(1, 0)
+    jogo.selecionar_poder(2, 0)
+    jogo.jogar_dados()
+    assert jogo.timer_evento > 0 and jogo.timer_dados_visiveis > 0
+    _tecla(jogo, pygame.K_r)
+    assert jogo.estado == "menu"
+    assert jogo.timer_evento == 0 and jogo.timer_dados_visiveis == 0
+    _quadros(jogo, 2)
+    assert jogo._ocioso()
+
+
+def test_ocioso_depois_de_salvar_no_menu(jogo):
+    _tecla(jogo, pygame.K_s)
+    assert jogo.timer_evento > 0
+    _quadros(jogo, jogo.timer_evento + 1)
+    assert jogo._ocioso()
+
+
+def test_hover_so_dos_botoes_da_tela_atual(jogo):
+    jogo._compor_quadro()
+    assert jogo.hover_botoes
+    jogo._iniciar_selecao()
+    jogo._compor_quadro()
+    # Os cartões de poder não têm hover: nada do menu pode sobrar
+    assert jogo.hover_botoes == {}
+
+
+@pytest.mark.parametrize("texto", ["-1", str(2 ** 64), "abc"])
+def test_semente_fora_do_intervalo_recusada(texto, capsys):
+    with pytest.raises(SystemExit):
+        criar_parser().parse_args(["--semente", texto])
+    assert "--semente" in capsys.readouterr().err
+
+
+def test_semente_maxima_gravada_no_registro(tmp_path):
+    args = criar_parser().parse_args(["--semente", str(MAX_SEMENTE)])
+    registro = RegistroPartida(args.semente)
+    caminho = tmp_path / "sessao.cest"
+    registro.salvar(caminho)
+    assert RegistroPartida.carregar(caminho).semente == MAX_SEMENTE
+
+
+@pytest.mark.parametrize("tamanho", [(520, 700), (500, 900), (529, 720)])
+def test_redimensionar_janela_estreita(jogo, tamanho):
+    jogo._compor_quadro()
+    jogo._aplicar_tamanho(tamanho)
+    jogo._compor_quadro()
+    jogo._iniciar_selecao()
+    jogo.selecionar_poder(1, 0)
+    jogo.selecionar_poder(2, 0)
+    jogo.jogar_dados()
+    jogo._compor_quadro()
+    assert jogo.tela.get_size() == tamanho
+
+
+@pytest.mark.parametrize("modo", ["pygame", "matplotlib"])
+@pytest.mark.parametrize("n_jogadores, tamanho", [(2, (800, 420)), (8, (1000, 500)), (2, (300, 200))])
+def test_painel_sem_espaco_para_o_grafico(tmp_path, monkeypatch, modo, n_jogadores, tamanho):
+    monkeypatch.chdir(tmp_path)
+    jogo = CorridaEstatistica(semente=1, grafico_assincrono=False, modo_grafico=modo, n_jogadores=n_jogadores)
+    try:
+        jogo._aplicar_tamanho(tamanho)
+        jogo._iniciar_selecao()
+        for pid in jogo.ids_jogadores:
+            jogo.selecionar_poder(pid, 0)
+        jogo.jogar_dados()
+        jogo._compor_quadro()
+        assert jogo.img_grafico_cache is None
+        # Com espaço de novo, o gráfico volta
+        jogo._aplicar_tamanho((1150, 720))
+        jogo._compor_quadro()
+        assert jogo.img_grafico_cache is not None or n_jogadores == 8
+    finally:
+        pygame.quit()
+
+
+@pytest.mark.parametrize("h_inch", [0.6, 0.44, 0.3])
+def test_banda_em_grafico_baixo(tmp_path, monkeypatch, h_inch):
+    monkeypatch.chdir(tmp_path)
+    jogo = CorridaEstatistica(semente=1, grafico_assincrono=False, modo_grafico="pygame", mostrar_banda=True)
+    try:
+        # Uma partida acaba em poucos lançamentos; a banda precisa de pelo menos dois marcos
+        for soma in [7, 5, 9, 6, 8, 4, 10, 7, 3, 11] * 3:
+            for pid in jogo.ids_jogadores:
+                jogo.estatisticas[pid].adicionar(soma)
+                jogo.historico_medias[pid].adicionar(jogo.estatisticas[pid].media)
+            jogo._series_grafico()
+        series = jogo._series_grafico()
+        assert any(len(s['banda_x']) >= 2 for s in series)
+        superficie = GraficoPygame().renderizar(series, 3.8, h_inch)
+        assert superficie.get_height() == int(h_inch * 100)
+    finally:
+        pygame.quit()
+
+
+def test_banda_escondida_nao_e_calculada(jogo):
+    for soma in [7, 5, 9, 6, 8, 4, 10, 7, 3, 11] * 3:
+        for pid in jogo.ids_jogadores:
+            jogo.estatisticas[pid].adicionar(soma)
+        jogo._series_grafico()
+    assert all(len(banda) == 0 for banda in jogo.bandas.values())
+
+    jogo.alternar_banda()
+    assert all(list(banda.xs) == [30] for banda in jogo.bandas.values())
+    series = jogo._series_grafico()
+    assert all(len(s['banda_x']) == 1 for s in series)
@@ -0,0 +1,24 @@
+import threading
+
+import numpy as np
+
+from markov import CadeiaCorrida, CadeiaEmSegundoPlano, cadeia
+from regras import gerar_casas_especiais
+
+
+def test_iteracao_igual_a_eliminacao_densa():
+    solucao = CadeiaCorrida(30, gerar_casas_especiais(30))
+    n = solucao.n_pos ** 2
+    matriz = np.eye(n)
+    np.add.at(matriz, (solucao.linhas, solucao.colunas), solucao.probs)
+    np.testing.assert_allclose(solucao.prob_vitoria, np.linalg.solve(matriz, np.ones(n)), atol=1e-12)
+
+
+def test_segundo_plano_nao_bloqueia():
+    pronta = threading.Event()
+    cadeias = CadeiaEmSegundoPlano(ao_concluir=pronta.set)
+    casas = gerar_casas_especiais(40)
+    assert cadeias.obter(40, casas) is None
+    assert pronta.wait(10)
+    solucao = cadeias.obter(40, casas)
+    np.testing.assert_array_equal(solucao.prob_vitoria, cadeia(40, casas).prob_vitoria)
@@ -0,0 +1,36 @@
+import perfil
+from perfil import INDICE, Perfilador
+
+
+def test_etapa_aninhada_nao_conta_duas_vezes(monkeypatch):
+    relogio = [0.0]
+    monkeypatch.setattr(perfil.time, "perf_counter", lambda: relogio[0])
+    p = Perfilador()
+    p.alternar()
+    p.iniciar_quadro()
+    painel = p.marcar()
+    relogio[0] += 0.002
+    grafico = p.marcar()
+    relogio[0] += 0.010
+    p.acumular("grafico", grafico)
+    relogio[0] += 0.001
+    p.acumular("painel", painel)
+    tabuleiro = p.marcar()
+    relogio[0] += 0.004
+    p.acumular("tabuleiro", tabuleiro)
+    p.fechar_quadro()
+
+    linha = p.recentes()[-1]
+    assert round(linha[INDICE["painel"]], 6) == 3.0
+    assert round(linha[INDICE["grafico"]], 6) == 10.0
+    assert round(linha[INDICE["tabuleiro"]], 6) == 4.0
+    assert round(sum(linha[INDICE[e]] for e in perfil.ETAPAS), 6) == round(linha[INDICE["quadro"]], 6)
+
+
+def test_desligado_nao_mede():
+    p = Perfilador()
+    inicio = p.marcar()
+    p.alternar()
+    p.iniciar_quadro()
+    p.acumular("eventos", inicio)
+    assert p._atual[INDICE["eventos"]] == 0.0
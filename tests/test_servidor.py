@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from servidor import ClienteCorrida, ServidorCorrida
+
+
+async def _com_servidor(teste):
+    servidor = ServidorCorrida()
+    tcp = await asyncio.start_server(servidor.atender, "127.0.0.1", 0)
+    porta = tcp.sockets[0].getsockname()[1]
+    try:
+        await teste(servidor, porta)
+    finally:
+        tcp.close()
+        await tcp.wait_closed()
+
+
+def test_desconectar_esperando_libera_o_assento():
+    async def teste(servidor, porta):
+        primeiro = await ClienteCorrida.conectar(porta=porta)
+        segundo = await ClienteCorrida.conectar(porta=porta)
+        id_partida, _ = await primeiro.pedir("NOVA", 2)
+        await segundo.pedir("ENTRAR", id_partida)
+        # Vez do jogador 1: o jogador 2 fica esperando e cai sem mandar SAIR
+        segundo.escritor.write(b"ESPERAR\n")
+        await segundo.escritor.drain()
+        await asyncio.sleep(0.05)
+        segundo.escritor.transport.abort()
+        await asyncio.sleep(0.05)
+        # Ninguém jogou: o assento foi liberado só pela desconexão
+        estado = await primeiro.pedir("ESTADO")
+        assert estado[0] == "abandonada"
+        assert servidor.conexoes == 1
+        await primeiro.fechar()
+
+    asyncio.run(_com_servidor(teste))
+
+
+def test_info_mostra_memoria_atual_e_pico():
+    async def teste(servidor, porta):
+        cliente = await ClienteCorrida.conectar(porta=porta)
+        info = dict(item.split("=") for item in await cliente.pedir("INFO"))
+        assert {"memoria_kb", "pico_memoria_kb"} <= set(info)
+        await cliente.fechar()
+
+    asyncio.run(_com_servidor(teste))
+
+
+def test_nova_com_semente_negativa_recusada():
+    async def teste(servidor, porta):
+        cliente = await ClienteCorrida.conectar(porta=porta)
+        with pytest.raises(RuntimeError, match="argumentos"):
+            await cliente.pedir("NOVA", 2, 30, -1)
+        await cliente.fechar()
+
+    asyncio.run(_com_servidor(teste))